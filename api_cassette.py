@@ -0,0 +1,232 @@
+import gzip
+import json
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from naver_cache import make_key
+
+# ----------------------------------------------------------------------
+# 외부 API 녹화/재생 (카세트)
+# GOREMI_API_MODE=record 이면 실제 응답을 gzip JSON Lines 카세트에 덧붙여 저장하고,
+# GOREMI_API_MODE=replay 이면 네트워크 없이 카세트의 응답을 그대로 돌려줍니다. (기본 live: 아무것도 하지 않음)
+# 네이버 호출은 NaverClient.request, OpenAI 호출은 openai_http_client() 의 httpx 트랜스포트가 이 층을 거칩니다.
+#   GOREMI_API_MODE=record GOREMI_CASSETTE=my.jsonl.gz streamlit run goremi_ai_price_naver.py   # 실제 키로 한 번 조회
+#   GOREMI_API_MODE=replay GOREMI_CASSETTE=my.jsonl.gz streamlit run goremi_ai_price_naver.py   # 같은 조회를 오프라인 재생
+# 저장소의 cassettes/demo.jsonl.gz 는 Google 페이지(goremi_ai_price_google.py)용 Custom Search 응답만 담고 있어
+# 키 없이 그 페이지를 열 때만 쓰입니다. 네이버/GPT 페이지는 위처럼 직접 녹화한 카세트로 재생하세요.
+#   python api_cassette.py cassettes/demo.jsonl.gz [--compact]   # 카세트 내용 요약 (--compact: 중복 정리 후 다시 압축)
+#
+# 키: 엔드포인트 경로 + 메서드 + 쿼리/바디. 인증 헤더와 IGNORED_FIELDS(조회 기간, API 키)는 키에서 빼서
+# 다른 날, 다른 키로 재생해도 같은 응답이 나오게 합니다. 같은 키를 여러 번 녹화하면 마지막 응답을 씁니다.
+# ----------------------------------------------------------------------
+
+MODES = ("live", "record", "replay")
+DEFAULT_MODE = os.environ.get("GOREMI_API_MODE", "live")
+DEFAULT_CASSETTE_PATH = os.environ.get("GOREMI_CASSETTE", os.path.join(".cache", "cassettes", "api.jsonl.gz"))
+DEMO_CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "demo.jsonl.gz")
+
+IGNORED_FIELDS = {"startDate", "endDate", "key"}
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """재생 모드에서 카세트에 없는 요청. 호출하는 쪽에는 연결 오류와 같이 보입니다."""
+
+
+def _request_payload(params: Optional[Dict[str, Any]] = None, json_body: Any = None,
+                     data: Optional[bytes] = None) -> Any:
+    if json_body is not None:
+        return json_body
+    if data:
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data.decode("utf-8", "replace")
+    return params or {}
+
+
+def _strip_ignored(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        return {k: _strip_ignored(v) for k, v in payload.items() if k not in IGNORED_FIELDS}
+    if isinstance(payload, list):
+        return [_strip_ignored(v) for v in payload]
+    return payload
+
+
+def cassette_key(method: str, url: str, payload: Any) -> str:
+    return make_key(url, {"method": method.upper(), "payload": _strip_ignored(payload)})
+
+
+class Cassette:
+    def __init__(self, path: str = DEFAULT_CASSETTE_PATH, mode: str = DEFAULT_MODE):
+        if mode not in MODES:
+            raise ValueError(f"알 수 없는 모드: {mode} (live/record/replay)")
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if mode != "live" and os.path.exists(path):
+            self._entries = load_entries(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, method: str, url: str, payload: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(cassette_key(method, url, payload))
+            if entry is None:
+                self.misses += 1
+            else:
+                self.replayed += 1
+        return entry
+
+    def save(self, method: str, url: str, payload: Any, status: int, headers: Dict[str, str], body: bytes) -> None:
+        entry = {
+            "k": cassette_key(method, url, payload), "m": method.upper(),
+            "u": url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0], "s": status,
+            "h": {name: headers[name] for name in KEPT_HEADERS if name in headers},
+            "b": body.decode("utf-8", "replace"),
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._entries[entry["k"]] = entry
+            self.recorded += 1
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # gzip 멤버를 이어 붙이는 방식이라 녹화 도중 끊겨도 앞의 기록은 그대로 읽힘
+            with gzip.open(self.path, "ab") as f:
+                f.write(line.encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "entries": len(self._entries), "recorded": self.recorded,
+                "replayed": self.replayed, "misses": self.misses}
+
+
+def load_entries(path: str) -> Dict[str, Dict[str, Any]]:
+    entries = {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry["k"]] = entry
+    except EOFError:  # 녹화 중 끊겨 잘린 마지막 멤버
+        pass
+    return entries
+
+
+def compact(path: str) -> int:
+    """중복 키(마지막 녹화만 유지)를 정리하고 gzip 멤버 하나로 다시 씁니다. 남은 건수를 반환."""
+    entries = load_entries(path)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries.values())
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def _as_response(entry: Dict[str, Any], url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["s"]
+    response._content = entry["b"].encode("utf-8")
+    response.headers = CaseInsensitiveDict(entry.get("h", {}))
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+def send(method: str, url: str, live: Callable[[], requests.Response], params: Optional[Dict[str, Any]] = None,
+         json_body: Any = None, data: Optional[bytes] = None, cassette: Optional[Cassette] = None) -> requests.Response:
+    """
+    live() 로 실제 요청을 보내는 함수를 감쌉니다.
+    replay: 카세트 응답(없으면 CassetteMiss), record: live() 결과를 저장 후 반환, live: live() 그대로.
+    """
+    cassette = cassette or get_cassette()
+    if cassette.mode == "live":
+        return live()
+    payload = _request_payload(params, json_body, data)
+    if cassette.mode == "replay":
+        entry = cassette.lookup(method, url, payload)
+        if entry is None:
+            raise CassetteMiss(f"카세트에 없는 요청: {method} {url} ({cassette.path})")
+        return _as_response(entry, url)
+    response = live()
+    cassette.save(method, url, payload, response.status_code, response.headers, response.content)
+    return response
+
+
+def openai_http_client(cassette: Optional[Cassette] = None):
+    """
+    OpenAI(http_client=...) 에 넘길 httpx 클라이언트. live 모드면 None (OpenAI 기본 클라이언트 사용).
+    녹화 모드에서는 응답(스트리밍 포함)을 끝까지 받은 뒤 저장하고 돌려주므로 스트리밍 표시가 한 번에 나옵니다.
+    """
+    cassette = cassette or get_cassette()
+    if cassette.mode == "live":
+        return None
+    import httpx
+
+    class CassetteTransport(httpx.BaseTransport):
+        def __init__(self):
+            self._live = httpx.HTTPTransport()
+
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            method, url = request.method, str(request.url)
+            payload = _request_payload(dict(request.url.params), None, request.read())
+            if cassette.mode == "replay":
+                entry = cassette.lookup(method, url, payload)
+                if entry is None:
+                    raise httpx.ConnectError(f"카세트에 없는 요청: {method} {url} ({cassette.path})", request=request)
+                return httpx.Response(entry["s"], headers=entry.get("h", {}), content=entry["b"].encode("utf-8"),
+                                      request=request)
+            response = self._live.handle_request(request)
+            body = response.read()
+            headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            cassette.save(method, url, payload, response.status_code, headers, body)
+            return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+        def close(self) -> None:
+            self._live.close()
+
+    return httpx.Client(transport=CassetteTransport())
+
+
+_default_cassette = None
+_default_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """프로세스 공용 카세트 (GOREMI_API_MODE / GOREMI_CASSETTE)."""
+    global _default_cassette
+    with _default_cassette_lock:
+        if _default_cassette is None:
+            _default_cassette = Cassette()
+        return _default_cassette
+
+
+def main(argv) -> int:
+    args = [arg for arg in argv[1:] if arg != "--compact"]
+    path = args[0] if args else DEFAULT_CASSETTE_PATH
+    if "--compact" in argv:
+        compact(path)
+    entries = load_entries(path)
+    by_path: Dict[str, int] = {}
+    for entry in entries.values():
+        by_path[f"{entry['m']} /{entry['u']}"] = by_path.get(f"{entry['m']} /{entry['u']}", 0) + 1
+    print(f"{path}: {len(entries)}건 ({os.path.getsize(path):,} bytes)")
+    for endpoint, count in sorted(by_path.items()):
+        print(f"  {count:>5}  {endpoint}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
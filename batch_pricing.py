@@ -0,0 +1,189 @@
+import argparse
+import csv
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from naver_analysis import (
+    get_naver_headers, analyze_search_trend, analyze_shopping_insight, analyze_competition_and_rarity, suggest_margin,
+)
+from naver_scheduler import BATCH, priority, track_denials
+from price_stats import competitor_price_stats
+
+# ----------------------------------------------------------------------
+# 카탈로그 일괄 마진 분석 (Streamlit 없이 실행)
+#   python batch_pricing.py products.csv results.csv --workers 5
+# 입력 CSV 컬럼: product, cost, category_id(선택)
+# 결과는 한 행이 끝날 때마다 바로 기록되며, 다시 실행하면 이미 끝난 행은 건너뜁니다.
+# 출력이 .parquet 이면 진행 중에는 <출력>.partial.csv 에 기록하고, 모두 끝나면 Parquet 로 변환합니다.
+# 네이버 호출은 batch 우선순위로 보내 화면 조회용 할당량을 남겨 둡니다. 할당량이 모자라 캐시로도 채우지 못한 행은
+# 기록하지 않고 실패로 남겨 다음 실행 때 다시 시도합니다. (naver_scheduler)
+# API 오류로 트렌드/쇼핑 인사이트 시계열이나 쇼핑 검색 결과를 받지 못한 행도 같은 방식으로 실패로 남깁니다.
+# 요청은 성공했지만 데이터가 없는 경우(신상품·틈새 상품: 빈 시계열, 검색 0건)는 정상 결과로 기록합니다.
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger("batch_pricing")
+
+DEFAULT_CATEGORY_ID = "50000006"
+OUTPUT_FIELDS = [
+    "product", "cost", "category_id",
+    "trend_score", "market_size_score", "competition_score", "rarity_score", "competitor_median",
+    "suggested_margin", "suggested_price", "finished_at",
+]
+
+
+def row_key(product, cost, category_id):
+    return (product.strip(), f"{float(cost):.2f}", (category_id or DEFAULT_CATEGORY_ID).strip())
+
+
+def read_products(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            product = (row.get("product") or "").strip()
+            if not product:
+                continue
+            yield product, float(row["cost"]), (row.get("category_id") or DEFAULT_CATEGORY_ID).strip()
+
+
+def read_done_keys(path):
+    """이미 기록된 결과 행의 키. 중간에 끊겨 잘린 마지막 줄은 무시합니다."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                if row.get("finished_at"):
+                    done.add(row_key(row["product"], row["cost"], row["category_id"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return done
+
+
+class AnalysisFailed(RuntimeError):
+    """네이버 응답을 받지 못해 기본 점수만 남은 분석. 결과로 기록하지 않고 실패로 남깁니다."""
+
+    def __init__(self, product, stage):
+        super().__init__(f"{product}: {stage} 데이터를 가져오지 못했습니다")
+        self.product = product
+        self.stage = stage
+
+
+def analyze_product(product, category_id, headers):
+    """
+    원가와 무관한 분석 단계: 트렌드 + 쇼핑 인사이트 + 경쟁/희소성 점수와 경쟁 가격 중앙값.
+    analyze_* 함수는 API 실패 시 기본 점수를 돌려주므로, 시계열/쇼핑 결과가 None(받지 못함)이면 AnalysisFailed 를 던집니다.
+    빈 시계열이나 검색 0건은 실제로 데이터가 없는 것이라 그대로 진행합니다. (화면의 shared_cache 가 저장하지 않는 실패 조건과 같음)
+    """
+    trend_score, _, trend_series = analyze_search_trend(product, headers)
+    if trend_series is None:
+        raise AnalysisFailed(product, "검색어 트렌드")
+    market_size_score, _, shopping_series = analyze_shopping_insight(product, headers, category_id)
+    if shopping_series is None:
+        raise AnalysisFailed(product, "쇼핑 인사이트")
+    comp_score, rarity_score, _, _, shop_results, news_results = analyze_competition_and_rarity(product, headers)
+    if shop_results is None:
+        raise AnalysisFailed(product, "쇼핑 검색")
+    if news_results is None:
+        raise AnalysisFailed(product, "뉴스 검색")
+    return {
+        "product": product, "category_id": category_id,
+        "trend_score": trend_score, "market_size_score": float(market_size_score),
+        "competition_score": comp_score, "rarity_score": rarity_score,
+        "competitor_median": competitor_price_stats(shop_results).get("median"),
+    }
+
+
+def apply_margin(analysis, cost):
+    """analyze_product 결과에 원가를 더해 suggest_margin 으로 제안 마진/판매가를 계산합니다."""
+    scores = {"trend": analysis["trend_score"], "market_size": analysis["market_size_score"],
+              "competition": analysis["competition_score"], "rarity": analysis["rarity_score"]}
+    final_margin, final_price = suggest_margin(scores, cost, analysis["competitor_median"])
+    return dict(analysis, cost=cost, market_size_score=round(analysis["market_size_score"], 4),
+                suggested_margin=round(final_margin, 2), suggested_price=final_price,
+                finished_at=datetime.now().isoformat(timespec="seconds"))
+
+
+def price_product(product, cost, category_id, headers):
+    """UI 와 같은 파이프라인: 트렌드 + 쇼핑 인사이트 + 경쟁/희소성 + 경쟁 가격 중앙값 -> suggest_margin."""
+    return apply_margin(analyze_product(product, category_id, headers), cost)
+
+
+def _price_row(product, cost, category_id, headers):
+    with priority(BATCH), track_denials() as denials:
+        result = price_product(product, cost, category_id, headers)
+    if denials:
+        raise denials[0]
+    return result
+
+
+def run_batch(input_path, output_path, headers, workers=5):
+    """남은 행을 workers 개씩 동시에 처리하고 끝나는 순서대로 기록합니다. (처리, 실패) 건수를 반환."""
+    to_parquet = output_path.endswith(".parquet")
+    checkpoint = output_path + ".partial.csv" if to_parquet else output_path
+    done = read_done_keys(checkpoint)
+    if to_parquet and os.path.exists(output_path):
+        import pandas as pd
+        previous = pd.read_parquet(output_path)
+        done |= {row_key(r.product, r.cost, r.category_id) for r in previous.itertuples()}
+    pending = [p for p in read_products(input_path) if row_key(*p) not in done]
+    logger.info("이미 완료된 %d건은 건너뜀, 남은 %d건", len(done), len(pending))
+
+    new_file = not os.path.exists(checkpoint) or os.path.getsize(checkpoint) == 0
+    if not new_file:
+        # 중단 시 마지막 줄이 줄바꿈 없이 잘렸으면 새 줄에서 이어 쓰기
+        with open(checkpoint, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    processed = failed = 0
+    with open(checkpoint, "a", newline="", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        futures = {pool.submit(_price_row, product, cost, category_id, headers): product
+                   for product, cost, category_id in pending}
+        for future in as_completed(futures):
+            try:
+                writer.writerow(future.result())
+            except Exception as e:  # 한 행이 실패해도 나머지는 계속 진행 (재실행 시 다시 시도)
+                failed += 1
+                logger.error("%s 분석 실패: %s", futures[future], e)
+                continue
+            out.flush()
+            os.fsync(out.fileno())
+            processed += 1
+
+    if to_parquet and failed == 0:
+        import pandas as pd
+        frames = [pd.read_csv(checkpoint, dtype={"category_id": str}).dropna(subset=["finished_at"])]
+        if os.path.exists(output_path):
+            frames.insert(0, pd.read_parquet(output_path))
+        pd.concat(frames, ignore_index=True).to_parquet(output_path, index=False)
+        os.remove(checkpoint)
+    return processed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 카탈로그 일괄 마진 분석")
+    parser.add_argument("input", help="입력 CSV (product, cost, category_id)")
+    parser.add_argument("output", help="결과 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--workers", type=int, default=5, help="동시에 분석할 상품 수 (데이터랩 요청은 최대 5개씩 묶임)")
+    parser.add_argument("--client-id", default=os.environ.get("NAVER_CLIENT_ID", ""))
+    parser.add_argument("--client-secret", default=os.environ.get("NAVER_CLIENT_SECRET", ""))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.client_id or not args.client_secret:
+        parser.error("네이버 API 키가 필요합니다 (--client-id/--client-secret 또는 NAVER_CLIENT_ID/NAVER_CLIENT_SECRET).")
+
+    headers = get_naver_headers(args.client_id, args.client_secret)
+    processed, failed = run_batch(args.input, args.output, headers, args.workers)
+    logger.info("완료: %d건 처리, %d건 실패", processed, failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
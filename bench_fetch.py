@@ -0,0 +1,48 @@
+import argparse
+import os
+import statistics
+import time
+
+# ----------------------------------------------------------------------
+# analyze_product_competitiveness 호출 단계 벤치마크
+# 로컬 스텁 서버를 상대로 순차 호출(기존) vs 동시 호출(현재)의 소요시간을 비교합니다.
+#   python bench_fetch.py --latency 0.2 --runs 5
+# ----------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 5개 엔드포인트 순차/동시 호출 비교")
+    parser.add_argument("--latency", type=float, default=0.2, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from naver_stub import start_stub_server
+
+    server, base_url = start_stub_server(args.latency)
+    os.environ["NAVER_API_BASE"] = base_url
+    os.environ["GOREMI_QUOTA_PATH"] = ""  # 스텁 호출은 실제 할당량과 무관 (bench_suite.py 와 같음)
+    os.environ["GOREMI_PRICE_HISTORY_PATH"] = ""  # 스텁 응답을 실제 가격 이력(.cache/price_history)에 쌓지 않음
+    import naver_fetch  # NAVER_API_BASE 설정 후 import 해야 스텁 주소를 사용
+
+    headers = {"X-Naver-Client-Id": "bench", "X-Naver-Client-Secret": "bench"}
+    calls = naver_fetch.build_competitiveness_calls("타코와사비", headers, "50000008", "2024-01-01", "2024-12-31")
+
+    timings = {}
+    for label, runner in (("sequential", naver_fetch.fetch_sequential), ("concurrent", naver_fetch.fetch_all)):
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            results = runner(calls, use_cache=False)
+            samples.append(time.perf_counter() - started)
+            assert all(r.ok for r in results.values()), results
+        timings[label] = samples
+        print(f"{label:>10}: median {statistics.median(samples) * 1000:7.1f} ms  "
+              f"(min {min(samples) * 1000:.1f} / max {max(samples) * 1000:.1f})")
+
+    speedup = statistics.median(timings["sequential"]) / statistics.median(timings["concurrent"])
+    print(f"speedup: x{speedup:.2f} (slowest single call ~ {args.latency * 1000:.0f} ms)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# ----------------------------------------------------------------------
+# 분석 함수 처리량/지연 벤치마크 (네트워크, 실제 API 키 불필요)
+# 로컬 스텁 서버(naver_stub.py)를 띄우고 동시성 수준별로 분석 함수를 반복 호출해
+# 처리량(rps)과 p50/p95 지연, 실패 건수를 JSON 으로 남깁니다.
+#   python bench_suite.py --latency 0.05 --error-rate 0.02 --concurrency 1 4 16 --output bench.json
+#   python bench_suite.py --baseline bench.json   # 기준 대비 tolerance 이상 느려지면 종료코드 1
+# 캐시/시계열 저장소는 임시 디렉터리를 쓰고, 호출마다 다른 상품명을 써서 매번 콜드 경로를 잽니다.
+# ----------------------------------------------------------------------
+
+TARGETS = [
+    "analyze_product_competitiveness",
+    "analyze_search_trend",
+    "analyze_competition_and_rarity",
+    "google_analyzers",
+]
+GOOGLE_RESULTS = 300  # Google 분석기 1회 호출당 합성 검색 결과 수
+
+
+def _google_results(product_name, size=GOOGLE_RESULTS):
+    templates = [
+        ("{p} 500g 2개 묶음 판매", "신선한 {p} 500g을 12,500원에 만나보세요. 온라인 최저가!"),
+        ("집에서 즐기는 이자카야! {p} 레시피", "간단하게 만드는 {p} 레시피를 공유합니다. 많은 분들이 추천하는 방법!"),
+        ("수입 문어 가격 급등, 자숙 문어 가격 20% 인상", "어획량 감소로 수입 문어 가격이 크게 올랐습니다."),
+        ("{p} 솔직 후기", "톡 쏘는 맛이 일품! 맥주 안주로 최고라는 후기가 많아요."),
+        ("대형마트, {p} 1kg 19,800원에 판매 시작", "가성비 좋은 대용량 {p}를 구매하세요."),
+        ("생 고추냉이 가격 동향", "가공 와사비는 물류비 영향으로 소폭 상승했습니다."),
+    ]
+    return [
+        {"index": i + 1, "title": title.format(p=product_name), "snippet": snippet.format(p=product_name)}
+        for i, (title, snippet) in enumerate(templates[i % len(templates)] for i in range(size))
+    ]
+
+
+def build_targets():
+    """이름 -> call(product_name) -> 성공 여부. NAVER_API_BASE 등 환경변수 설정 뒤에 호출해야 합니다."""
+    import google_analysis
+    import grok_analysis
+    import naver_analysis
+
+    headers = naver_analysis.get_naver_headers("bench", "bench")
+
+    def competitiveness(name):
+        _, evidences = grok_analysis.analyze_product_competitiveness(name, "bench", "bench")
+        return "추정 모드" not in evidences
+
+    def search_trend(name):
+        return naver_analysis.analyze_search_trend(name, headers)[2] is not None
+
+    def competition_and_rarity(name):
+        return bool(naver_analysis.analyze_competition_and_rarity(name, headers)[4])
+
+    def google_analyzers(name):
+        results = _google_results(name)
+        signals = google_analysis.scan_search_results(name, results)
+        demand_score, _, _ = google_analysis.analyze_demand_popularity(name, results, signals)
+        comp_score, avg_price, _, _ = google_analysis.analyze_competition(name, results, signals)
+        rarity_score, _, _ = google_analysis.analyze_rarity_cost(name, results, signals)
+        scores = {"demand": demand_score, "competition": comp_score, "rarity": rarity_score, "avg_price": avg_price}
+        return google_analysis.suggest_margin(scores, 3000)[1] > 0
+
+    return {
+        "analyze_product_competitiveness": competitiveness,
+        "analyze_search_trend": search_trend,
+        "analyze_competition_and_rarity": competition_and_rarity,
+        "google_analyzers": google_analyzers,
+    }
+
+
+def run_level(name, call, concurrency, requests):
+    """같은 함수를 concurrency 개 스레드로 requests 번 호출하고 지연/처리량을 집계합니다."""
+    from stage_timing import percentile
+
+    def one(i):
+        started = time.perf_counter()
+        try:
+            ok = call(f"벤치{name[:6]}{concurrency}-{i}")
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    return {
+        "target": name, "concurrency": concurrency, "requests": requests,
+        "wall_s": round(wall, 4), "throughput_rps": round(requests / wall, 3) if wall > 0 else None,
+        "p50_ms": round(percentile(latencies, 0.5), 3), "p95_ms": round(percentile(latencies, 0.95), 3),
+        "max_ms": round(latencies[-1], 3), "failures": sum(1 for _, ok in samples if not ok),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """기준 결과 대비 p50 이 (1+tolerance) 배 넘게 늘었거나 처리량이 (1-tolerance) 배 밑으로 떨어진 항목."""
+    previous = {(r["target"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["target"], result["concurrency"]))
+        if before is None:
+            continue
+        if result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result['target']} x{result['concurrency']}: p50 {before['p50_ms']:.1f} -> {result['p50_ms']:.1f} ms")
+        if before.get("throughput_rps") and result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{result['target']} x{result['concurrency']}: "
+                               f"{before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 함수 처리량/지연 벤치마크 (로컬 스텁 서버)")
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 응답 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="스텁 429/500 오류 비율 (0~1)")
+    parser.add_argument("--fixtures", help="저장된 응답 JSON 디렉터리 (naver_stub.load_fixtures)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="동시성 수준마다 호출 수")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 표준출력)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="회귀로 볼 변화 비율")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # 주입한 오류의 경고 로그는 숨김
+    from naver_stub import start_stub_server
+
+    server, base_url = start_stub_server(args.latency, error_rate=args.error_rate, fixtures_dir=args.fixtures)
+    workdir = tempfile.mkdtemp(prefix="goremi-bench-")
+    # 모듈들이 import 시점에 읽는 설정이므로 import 전에 지정
+    os.environ.update({
+        "NAVER_API_BASE": base_url,
+        "GOREMI_CACHE_PATH": os.path.join(workdir, "naver_api.sqlite3"),
+        "GOREMI_SERIES_PATH": os.path.join(workdir, "datalab_series.sqlite3"),
+        "GOREMI_TIMINGS_PATH": "",
+        "GOREMI_QUOTA_PATH": "",  # 스텁 호출은 실제 할당량과 무관
+        "GOREMI_PRICE_HISTORY_PATH": "",  # 스텁 응답을 실제 가격 이력에 쌓지 않고, Parquet 기록도 측정에서 제외
+    })
+    targets = build_targets()
+
+    results = []
+    for name in args.targets:
+        for concurrency in args.concurrency:
+            result = run_level(name, targets[name], concurrency, args.requests)
+            results.append(result)
+            print(f"{name:<34} x{concurrency:<3} {result['throughput_rps']:>8.2f} rps  p50 {result['p50_ms']:>8.1f} ms  "
+                  f"p95 {result['p95_ms']:>8.1f} ms  fail {result['failures']}", file=sys.stderr)
+    server.shutdown()
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "latency": args.latency, "error_rate": args.error_rate, "fixtures": args.fixtures,
+                 "requests": args.requests},
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
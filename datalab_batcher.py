@@ -0,0 +1,207 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from naver_cache import endpoint_kind, get_cache, make_key, warm_ttl
+from naver_client import get_client
+from naver_scheduler import INTERACTIVE, PRIORITY_ORDER, QuotaExhausted, current_priority, note_denied, priority
+
+# ----------------------------------------------------------------------
+# 데이터랩 요청 묶음 처리
+# 동시에 들어온 여러 상품의 데이터랩 요청을 keywordGroups(최대 5개) 하나로 합쳐 보내고,
+# 응답을 상품별로 다시 나눕니다. 배치 실행이나 여러 세션이 동시에 분석할 때 호출 수가 최대 1/5 로 줄어듭니다.
+#
+# 주의: 데이터랩 ratio 는 "요청 안의 모든 그룹 중 최댓값 = 100" 으로 정규화됩니다.
+# 단독 요청이었다면 그 그룹의 최댓값이 100 이므로, 나눈 뒤 그룹별로 최댓값 100 이 되도록 다시 맞춰
+# 단독 요청과 같은 값이 되게 합니다.
+# 다만 인기 키워드와 묶이면 틈새 키워드의 ratio 가 0 근처로 반올림되어 다시 맞춰도 복원되지 않으므로,
+# 묶음 안에서 최댓값이 NEAR_ZERO_PEAK 미만인 그룹은 단독 요청으로 한 번 더 받습니다. (그 그룹만 호출 1회 추가)
+# 묶음은 참여한 요청 중 가장 높은 우선순위(naver_scheduler)로 보내고, 가장 긴 keep_warm TTL 로 캐시합니다.
+# 화면 조회(interactive)는 linger 동안 기다리지 않습니다. 대기 중인 묶음이 있으면 합류해 바로 보내고,
+# 없으면 단독으로 바로 보냅니다. 기다렸다 묶는 것은 배치/미리 받기(batch, prefetch) 요청뿐입니다.
+# ----------------------------------------------------------------------
+
+# 엔드포인트별 한 요청에 담을 수 있는 그룹 수
+MAX_GROUPS = {
+    "/v1/datalab/search": 5,
+    "/v1/datalab/shopping/category/keywords": 5,
+    "/v1/datalab/shopping/categories": 3,
+}
+DEFAULT_LINGER = 0.05  # 같은 묶음에 다른 요청이 합류하기를 기다리는 시간(초, interactive 제외)
+NEAR_ZERO_PEAK = 1.0   # 묶음 응답에서 그룹 최댓값이 이보다 작으면 단독 요청으로 다시 받음
+
+
+def _max_groups(url: str) -> int:
+    for path, limit in MAX_GROUPS.items():
+        if url.endswith(path):
+            return limit
+    return 1
+
+
+def _peak(group_result: Dict[str, Any]) -> float:
+    return max((float(item.get("ratio", 0)) for item in group_result.get("data", [])), default=0.0)
+
+
+def _renormalize(group_result: Dict[str, Any]) -> Dict[str, Any]:
+    data = group_result.get("data", [])
+    peak = _peak(group_result)
+    if peak <= 0:
+        return group_result
+    scaled = [dict(item, ratio=round(float(item.get("ratio", 0)) * 100.0 / peak, 5)) for item in data]
+    return dict(group_result, data=scaled)
+
+
+class _Bucket:
+    __slots__ = ("url", "headers", "base_body", "group_field", "groups", "futures", "timer", "priority", "ttl")
+
+    def __init__(self, url, headers, base_body, group_field):
+        self.url = url
+        self.headers = headers
+        self.base_body = base_body
+        self.group_field = group_field
+        self.groups: List[Dict[str, Any]] = []
+        self.futures: List[List[Future]] = []
+        self.timer: Optional[threading.Timer] = None
+        self.priority: Optional[str] = None
+        self.ttl: Optional[float] = None
+
+
+class DatalabBatcher:
+    def __init__(self, linger: float = DEFAULT_LINGER):
+        self.linger = linger
+        self.requests_sent = 0
+        self.groups_sent = 0
+        self.solo_retries = 0  # 묶음에서 0 근처로 나와 단독으로 다시 보낸 그룹 수
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def submit(self, url: str, headers: Dict[str, str], body: Dict[str, Any], group_field: str) -> Future:
+        """
+        단일 그룹 요청 body 를 받아 Future[(status, data)] 를 돌려줍니다.
+        data 는 단독 요청 응답과 같은 모양(results 1개)입니다.
+        """
+        future: Future = Future()
+        single_key = make_key(url, body)
+        warm = warm_ttl()
+        cached = get_cache().get(endpoint_kind(url), single_key, min_fresh=warm or 0.0)
+        if cached is not None:
+            future.set_result((200, cached))
+            return future
+
+        (group,) = body[group_field]
+        base_body = {k: v for k, v in body.items() if k != group_field}
+        # 인증 정보가 다른 요청끼리는 묶지 않음 (메모리 안의 키에만 해시로 사용)
+        bucket_id = hashlib.sha256(json.dumps(
+            [url, sorted(headers.items()), base_body, group_field], ensure_ascii=False, sort_keys=True,
+        ).encode("utf-8")).hexdigest()
+
+        ready = None
+        level = current_priority()
+        with self._lock:
+            bucket = self._buckets.get(bucket_id)
+            if bucket is None:
+                bucket = self._buckets[bucket_id] = _Bucket(url, headers, base_body, group_field)
+                if level != INTERACTIVE:
+                    bucket.timer = threading.Timer(self.linger, self._flush_id, args=(bucket_id,))
+                    bucket.timer.daemon = True
+                    bucket.timer.start()
+            if bucket.priority is None or PRIORITY_ORDER[level] < PRIORITY_ORDER[bucket.priority]:
+                bucket.priority = level
+            if warm and (bucket.ttl is None or warm > bucket.ttl):
+                bucket.ttl = warm
+            if group in bucket.groups:  # 같은 상품이 동시에 들어오면 한 그룹으로 공유
+                bucket.futures[bucket.groups.index(group)].append(future)
+            else:
+                bucket.groups.append(group)
+                bucket.futures.append([future])
+            if level == INTERACTIVE or len(bucket.groups) >= _max_groups(url):
+                ready = self._buckets.pop(bucket_id)
+                if ready.timer is not None:
+                    ready.timer.cancel()
+        if ready is not None:
+            self._send(ready)
+        return future
+
+    def _flush_id(self, bucket_id: str) -> None:
+        with self._lock:
+            bucket = self._buckets.pop(bucket_id, None)
+        if bucket is not None:
+            self._send(bucket)
+
+    def _send(self, bucket: _Bucket) -> None:
+        body = dict(bucket.base_body, **{bucket.group_field: bucket.groups})
+        try:
+            with priority(bucket.priority):
+                response = get_client().post(
+                    bucket.url, headers=bucket.headers, data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                )
+            status, data = response.status_code, (response.json() if response.status_code == 200 else None)
+        except Exception as e:
+            for futures in bucket.futures:
+                for future in futures:
+                    future.set_exception(e)
+            return
+        with self._lock:
+            self.requests_sent += 1
+            self.groups_sent += len(bucket.groups)
+
+        results = (data or {}).get("results", [])
+        header = {k: v for k, v in (data or {}).items() if k != "results"}
+        solo: List[int] = []
+        for index, (group, futures) in enumerate(zip(bucket.groups, bucket.futures)):
+            outcome: Tuple[int, Optional[Dict[str, Any]]] = (status, None)
+            if status == 200 and index < len(results) and len(bucket.groups) > 1 \
+                    and _peak(results[index]) < NEAR_ZERO_PEAK:
+                solo.append(index)  # 아래에서 단독 요청으로 다시 받아 결과를 채움
+                continue
+            if status == 200 and index < len(results):
+                group_result = results[index] if len(bucket.groups) == 1 else _renormalize(results[index])
+                single = dict(header, results=[group_result])
+                kind = endpoint_kind(bucket.url)
+                get_cache().set(kind, make_key(bucket.url, dict(bucket.base_body, **{bucket.group_field: [group]})), single,
+                                ttl=max(bucket.ttl, get_cache().ttl_for(kind)) if bucket.ttl else None)
+                outcome = (200, single)
+            for future in futures:
+                future.set_result(outcome)
+
+        for index in solo:
+            single = _Bucket(bucket.url, bucket.headers, bucket.base_body, bucket.group_field)
+            single.groups, single.futures = [bucket.groups[index]], [bucket.futures[index]]
+            single.priority, single.ttl = bucket.priority, bucket.ttl
+            with self._lock:
+                self.solo_retries += 1
+            self._send(single)
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests_sent, "groups": self.groups_sent, "solo_retries": self.solo_retries}
+
+
+_default_batcher = None
+_default_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> DatalabBatcher:
+    """프로세스 공용 배처 (여러 세션/스레드의 요청을 함께 묶음)."""
+    global _default_batcher
+    with _default_batcher_lock:
+        if _default_batcher is None:
+            _default_batcher = DatalabBatcher()
+        return _default_batcher
+
+
+def datalab_request(url: str, headers: Dict[str, str], body: Dict[str, Any], group_field: str,
+                    timeout: Optional[float] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    단일 그룹 데이터랩 요청을 배처를 통해 보내고 결과를 기다립니다.
+    할당량 부족으로 보내지 못하면 만료된 캐시라도 돌려주고, 그것도 없으면 QuotaExhausted 를 다시 던집니다.
+    """
+    try:
+        return get_batcher().submit(url, headers, body, group_field).result(timeout=timeout)
+    except QuotaExhausted as e:
+        stale = get_cache().get(endpoint_kind(url), make_key(url, body), allow_stale=True)
+        if stale is not None:
+            return 200, stale
+        note_denied(e)
+        raise
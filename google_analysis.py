@@ -0,0 +1,250 @@
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from keyword_scanner import DEMAND_KEYWORDS, estimate_raw_materials, scan_search_results
+from margin_simulation import DEFAULT_SAMPLES, google_margin_samples, make_rng, sample_median, summarize
+from naver_client import get_client
+from price_stats import remove_outliers
+
+# ----------------------------------------------------------------------
+# Google 검색 결과 기반 분석 백엔드
+# Streamlit 없이도 import 할 수 있도록 UI(goremi_ai_price_google.py)와 분리했습니다. (벤치마크, 외부 호출용)
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# 진행 상황 출력 대상. 기본은 로깅이며, Streamlit 화면에서는 set_notifier(st.write)로 교체
+_notify = {"progress": logger.info}
+
+
+def set_notifier(progress):
+    _notify["progress"] = progress
+
+
+# ----------------------------------------------------------------------
+# 0. Google 검색 (Custom Search JSON API)
+# 공용 HTTP 클라이언트와 녹화/재생 층(api_cassette)을 거치므로, 키 없이도 카세트로 재생할 수 있습니다.
+# ----------------------------------------------------------------------
+
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+DEMO_PRODUCT = "타코와사비"  # 데모 카세트(api_cassette.DEMO_CASSETTE_PATH)에 녹화된 제품
+
+
+def search_queries(product_name):
+    """제품 자체(구매/가격/후기/레시피)와 추정 원재료의 가격 동향 검색어."""
+    queries = [f'"{product_name}" 온라인 구매', f'"{product_name}" 가격', f'"{product_name}" 후기', f'"{product_name}" 레시피']
+    queries += [f"{material} 가격 동향" for material in estimate_raw_materials(product_name) if material != product_name]
+    return queries
+
+
+def google_search(product_name, api_key="", cse_id="", cassette=None):
+    """
+    검색어별 상위 10건을 동시에 받아 [{'index', 'title', 'snippet'}] 로 합칩니다. (같은 링크는 한 번만)
+    재생 모드(cassette.mode == "replay")에서는 네트워크 없이 카세트 응답을 씁니다. 실패 시 requests 예외.
+    """
+    def fetch(query):
+        params = {"key": api_key, "cx": cse_id, "q": query, "num": 10, "hl": "ko"}
+        response = get_client().get(GOOGLE_SEARCH_URL, params=params, cassette=cassette)
+        response.raise_for_status()
+        return response.json().get("items", [])
+
+    queries = search_queries(product_name)
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        pages = list(pool.map(fetch, queries))
+    results, seen = [], set()
+    for item in (item for page in pages for item in page):
+        link = item.get("link") or item.get("title")
+        if link in seen:
+            continue
+        seen.add(link)
+        results.append({"index": len(results) + 1, "title": item.get("title", ""), "snippet": item.get("snippet", "")})
+    return results
+
+
+def demo_search_results(product_name, cassette):
+    """
+    API 키 없이 쓰는 데모 결과: 녹화된 DEMO_PRODUCT 검색 결과를 재생하고 제목/스니펫의 제품명만 바꿔 끼웁니다.
+    (예전 더미 데이터처럼 어떤 제품명이든 화면 흐름을 확인할 수 있음. 점수는 참고용)
+    """
+    results = google_search(DEMO_PRODUCT, cassette=cassette)
+    if product_name != DEMO_PRODUCT:
+        for item in results:
+            item["title"] = item["title"].replace(DEMO_PRODUCT, product_name)
+            item["snippet"] = item["snippet"].replace(DEMO_PRODUCT, product_name)
+    return results
+
+
+# ----------------------------------------------------------------------
+# 1. AI 분석 모듈 (Back-end)
+# 실제 시스템에서는 이 부분을 고도화된 AI 모델로 대체할 수 있습니다.
+# ----------------------------------------------------------------------
+
+# google_search 결과(제목 + 스니펫)를 바탕으로 점수를 계산하는 함수들입니다.
+
+def analyze_demand_popularity(product_name, search_results, signals=None):
+    """
+    수요 및 인기도 분석 함수
+    - 검색 결과에서 '후기', '레시피', '맛집' 등의 키워드 빈도를 바탕으로 점수 산정
+    - signals: scan_search_results 결과 (세 분석 함수가 같은 스캔 결과를 공유)
+    """
+    _notify["progress"]("### 💡 수요 및 인기도 분석 중...")
+    
+    # 검색 결과 스니펫에서 키워드 카운트
+    # 실제로는 자연어 처리(NLP) 모델을 사용하여 긍정/부정 감성 분석 등을 수행할 수 있습니다.
+    keywords = DEMAND_KEYWORDS
+    signals = signals if signals is not None else scan_search_results(product_name, search_results)
+    demand_score = 1
+    evidence = []
+
+    for result, hits in zip(search_results, signals):
+        for keyword in keywords:
+            if keyword in hits["demand"]:
+                demand_score += 1
+                if len(evidence) < 5: # 증거는 최대 5개까지만 수집
+                    evidence.append(f"'{keyword}' 언급: {result['title']} [검색결과 {result['index']}]")
+
+    # 점수를 1~10점으로 정규화
+    demand_score = min(10, demand_score) 
+    
+    explanation = f"'{product_name}' 관련 소셜 및 웹 문서에서 **'{', '.join(keywords)}'** 등의 키워드가 다수 발견되어 소비자 관심도가 **{'높음' if demand_score > 6 else '보통' if demand_score > 3 else '낮음'}**으로 판단됩니다."
+    
+    return demand_score, explanation, evidence
+
+
+def analyze_competition(product_name, search_results, signals=None):
+    """
+    경쟁사 및 가격 분석 함수
+    - '판매', '가격', '구매' 키워드 및 숫자(가격) 패턴으로 경쟁 강도 분석
+    """
+    _notify["progress"]("### ⚔️ 경쟁 환경 분석 중...")
+
+    signals = signals if signals is not None else scan_search_results(product_name, search_results)
+    competitor_count = 0
+    prices = []
+    evidence = []
+
+    for result, hits in zip(search_results, signals):
+        if hits["competitor"]:
+            competitor_count += 1
+            if len(evidence) < 5:
+                 evidence.append(f"경쟁사 추정: {result['title']} [검색결과 {result['index']}]")
+
+            # 가격 정보 (스캔 단계에서 '숫자원' 패턴으로 추출, 100원~100만원 범위만)
+            prices.extend(hits["prices"])
+
+    # 경쟁 강도 점수화 (경쟁사가 많을수록 점수가 높음)
+    competition_score = min(10, competitor_count * 2)
+    # 이상치(IQR 밖)를 제거한 중앙값을 경쟁사 기준가로 사용
+    import numpy as np
+    avg_price = int(np.median(remove_outliers(np.array(prices, dtype=np.float64)))) if prices else 0
+
+    explanation = f"온라인에서 **{competitor_count}개 이상의 경쟁 판매처**가 식별되었습니다. 경쟁 강도는 **{'치열함' if competition_score > 6 else '보통' if competition_score > 3 else '낮음'}** 수준입니다."
+    if avg_price > 0:
+        explanation += f" 경쟁사 판매가 중앙값은 **약 {avg_price:,}원**으로 추정됩니다."
+
+    return competition_score, avg_price, explanation, evidence
+
+
+def analyze_rarity_cost(product_name, search_results, signals=None):
+    """
+    원재료 희소성 및 원가 변동성 분석 함수
+    - 원재료 + '가격', '수입', '급등', '동향' 등의 키워드로 희소성 점수 추정
+    """
+    _notify["progress"]("### 💎 원재료 희소성 및 원가 분석 중...")
+    
+    # 제품명으로부터 핵심 원재료 추정 (실제 시스템에서는 원재료 DB 필요)
+    # 예시: '타코와사비' -> '문어', '고추냉이'
+    raw_materials = estimate_raw_materials(product_name)
+    signals = signals if signals is not None else scan_search_results(product_name, search_results)
+
+    rarity_score = 1
+    evidence = []
+    
+    # "문어 가격", "고추냉이 수입" 등의 키워드로 검색된 결과 분석
+    for result, hits in zip(search_results, signals):
+        # 가격 상승/수급 불안 관련 키워드가 있는지 확인
+        if hits["material"] and hits["shortage"]:
+            rarity_score += 2
+            if len(evidence) < 5:
+                evidence.append(f"원가 상승 요인: {result['title']} [검색결과 {result['index']}]")
+
+    rarity_score = min(10, rarity_score)
+    explanation = f"핵심 원재료({', '.join(raw_materials)})의 수급 불안정 또는 가격 상승 관련 정보가 식별되어 희소성이 **{'높음' if rarity_score > 6 else '보통' if rarity_score > 3 else '낮음'}**으로 분석됩니다."
+
+    return rarity_score, explanation, evidence
+
+def suggest_margin(scores, base_cost):
+    """
+    최종 마진 제안 함수
+    - 각 분석 점수를 바탕으로 최종 마진율과 제안 가격 계산
+    """
+    demand_score = scores['demand']
+    competition_score = scores['competition']
+    rarity_score = scores['rarity']
+    avg_competitor_price = scores['avg_price']
+
+    # 기본 마진율 설정
+    base_margin = 30.0
+
+    # 점수에 따른 마진율 조정
+    # 수요가 높을수록 마진 추가 (최대 10%)
+    demand_bonus = (demand_score - 5) * 1.0 
+    # 희소성이 높을수록 마진 추가 (최대 10%)
+    rarity_bonus = (rarity_score - 5) * 1.0
+    # 경쟁이 치열할수록 마진 감소 (최대 10%)
+    competition_penalty = (competition_score - 5) * 1.0
+    
+    suggested_margin = base_margin + demand_bonus + rarity_bonus - competition_penalty
+    
+    # 마진율을 10% ~ 70% 사이로 제한
+    suggested_margin = max(10.0, min(70.0, suggested_margin))
+
+    # 제안 판매가 계산
+    suggested_price = int(base_cost / (1 - (suggested_margin / 100)))
+
+    # 경쟁사 가격을 고려한 최종 가격 조정 (소비자 저항선 고려)
+    # 만약 경쟁사 평균가가 존재하고, 우리 제안가가 30% 이상 비싸면 조정
+    # 단, 최소 마진(10%) 가격 아래로는 내리지 않음 (경쟁가가 원가보다 낮아도 원가 이하로 제안하지 않음)
+    floor_price = base_cost / (1 - 10.0 / 100)
+    if avg_competitor_price > 0 and suggested_price > avg_competitor_price * 1.3:
+        final_price = max(int(avg_competitor_price * 1.2), math.ceil(floor_price)) # 경쟁사보다 20% 높은 수준으로 재조정
+    else:
+        final_price = suggested_price
+    
+    # 100원 단위로 반올림 (최소 마진 아래로 내려가면 올림)
+    final_price = round(final_price / 100) * 100
+    if final_price < floor_price:
+        final_price = math.ceil(floor_price / 100) * 100
+    final_margin = (1 - (base_cost / final_price)) * 100 if final_price > 0 else 0
+
+    return final_margin, final_price
+
+
+def simulate_margin(scores, base_cost, signals=None, samples=DEFAULT_SAMPLES, seed=None):
+    """
+    suggest_margin 의 불확실성 구간 (P10/P50/P90 마진율과 판매가). margin_simulation 참고.
+    signals(scan_search_results 결과)를 복원추출해 수요/경쟁/희소성 신호 건수를 다시 세고,
+    경쟁 가격 중앙값은 가격 표본의 분포에서 뽑습니다. signals 가 없으면 scores 의 점 추정값을 그대로 씁니다.
+    """
+    import numpy as np
+    rng = make_rng(seed)
+    demand, competition, rarity = scores['demand'], scores['competition'], scores['rarity']
+    avg_price = scores.get('avg_price', 0)
+    if signals:
+        # 결과별 (수요 키워드 수, 경쟁 신호, 원재료+수급 신호) -> 복원추출한 결과 묶음마다 세 점수를 다시 계산.
+        # 결과는 몇 가지 신호 조합으로만 나뉘므로, 조합별 뽑힌 횟수(다항분포)로 복원추출을 대신합니다.
+        per_result = np.array([(len(hits["demand"]), bool(hits["competitor"]), bool(hits["material"] and hits["shortage"]))
+                               for hits in signals], dtype=np.int64)
+        combos, sizes = np.unique(per_result, axis=0, return_counts=True)
+        counts = rng.multinomial(len(signals), sizes / len(signals), size=samples) @ combos
+        demand = np.minimum(10, 1 + counts[:, 0])
+        competition = np.minimum(10, counts[:, 1] * 2)
+        rarity = np.minimum(10, 1 + counts[:, 2] * 2)
+        prices = remove_outliers(np.array([p for hits in signals if hits["competitor"] for p in hits["prices"]],
+                                          dtype=np.float64))
+        if prices.size:
+            p25, p50, p75 = np.percentile(prices, [25, 50, 75])
+            avg_price = sample_median(p50, p25, p75, prices.size, samples, rng)
+    return summarize(*google_margin_samples(demand, competition, rarity, base_cost, avg_price))
+
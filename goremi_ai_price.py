@@ -1,34 +1,23 @@
+import hashlib
+
 import streamlit as st
-from openai import OpenAI
+
+from api_cassette import get_cassette, openai_http_client
+from gpt_pricing import FIELDS, RecommendationStream, recommend_prices
 
 # 🔑 API 키 설정 (secrets.toml 또는 직접 입력)
 api_key = st.secrets["openai_api_key"] if "openai_api_key" in st.secrets else st.text_input("🔐 OpenAI API Key", type="password")
 
-# OpenAI 클라이언트 생성
-client = OpenAI(api_key=api_key)
-
-# GPT에게 가격 제안 요청
-def get_price_recommendation(product_name):
-    prompt = f"""
-    상품명: {product_name}
-
-    이 상품의 시장 경쟁 강도, 마진 구조, 적정 소비자 가격대를 GPT 데이터 기반으로 분석해줘.
-    간단한 근거와 함께 아래의 형식으로 출력해줘.
+# OpenAI 클라이언트 생성 (키별로 한 번만 만들어 재실행/세션 간 재사용, 캐시 키에는 키 해시만 사용)
+# GOREMI_API_MODE=record/replay 이면 카세트 트랜스포트를 거칩니다. (재생 모드는 API 키 없이도 동작)
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key_fingerprint, _api_key):
+    from openai import OpenAI  # 무거운 SDK 는 클라이언트를 처음 만들 때만 불러옴
+    if get_cassette().mode == "replay":
+        _api_key = _api_key or "replay"
+    return OpenAI(api_key=_api_key, http_client=openai_http_client())
 
-    1. 경쟁강도: 낮음 / 중간 / 높음
-    2. 마진구조: 하 / 중 / 상
-    3. 적정 소비자 가격대 (B2C): ~ 원
-    4. 적정 납품 가격대 (B2B): ~ 원
-    5. 비고 및 전략 제안: 한 줄 정도
-    """
-
-    completion = client.chat.completions.create(
-        model="gpt-3.5-turbo",  # ✅ 여기 변경됨
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.5,
-    )
-
-    return completion.choices[0].message.content
+client = get_openai_client(hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(), api_key)
 
 # Streamlit UI 구성
 st.title("🧠 GPT 기반 가격 제안 시스템")
@@ -36,11 +25,40 @@ st.write("상품명을 입력하면 GPT가 시장 분석과 가격 전략을 제
 
 product = st.text_input("📦 상품명 입력", placeholder="예: 타코와사비, 가니미소, 주꾸미볶음 등")
 
+# GPT에게 가격 제안 요청 (같은 상품명은 로컬 캐시에서 바로 반환, 세션/재시작 간 공유)
+# 응답은 도착하는 대로 그립니다. 도중에 상품명을 바꾸면 Streamlit 이 스크립트를 다시 실행하면서
+# 진행 중인 반복이 중단되고, RecommendationStream 이 연결을 끊습니다. (중단된 응답은 캐시에 남기지 않음)
 if st.button("🔍 가격 제안 받기") and product:
-    with st.spinner("GPT가 분석 중입니다..."):
-        try:
-            result = get_price_recommendation(product)
-            st.markdown("### 💡 GPT 분석 결과")
-            st.markdown(result)
-        except Exception as e:
-            st.error(f"에러 발생: {e}")
+    st.markdown("### 💡 GPT 분석 결과")
+    placeholder = st.empty()
+    placeholder.caption("GPT가 분석 중입니다...")
+    stream = RecommendationStream(client, product)
+    try:
+        for text in stream:
+            placeholder.markdown(text)
+        source = "캐시" if stream.cached else "GPT"
+        first_token = f"{stream.first_token:.2f}초" if stream.first_token is not None else "-"
+        st.caption(f"{source} 응답 · 첫 토큰 {first_token} · 전체 {stream.total:.2f}초")
+    except Exception as e:
+        st.error(f"에러 발생: {e}")
+
+# 여러 상품 한 번에 조회 (한 줄에 상품명 하나)
+st.markdown("---")
+st.subheader("📋 여러 상품 일괄 제안")
+batch_text = st.text_area("상품명 목록 (한 줄에 하나)", height=150)
+if st.button("📋 일괄 제안 받기"):
+    names = [line.strip() for line in batch_text.splitlines() if line.strip()]
+    if names:
+        with st.spinner(f"GPT가 {len(names)}개 상품을 분석 중입니다..."):
+            results = recommend_prices(client, names)
+        rows = []
+        for name, rec in results.items():
+            if isinstance(rec, Exception):
+                rows.append({"product": name, "error": str(rec)})
+            else:
+                rows.append(dict(rec, product=name, error=""))
+        import pandas as pd
+        df = pd.DataFrame(rows, columns=["product"] + FIELDS + ["error"])
+        st.dataframe(df, use_container_width=True)
+        st.download_button("📥 CSV 다운로드", df.to_csv(index=False).encode("utf-8-sig"),
+                           file_name="gpt_price_recommendations.csv", mime="text/csv")
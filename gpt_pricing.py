@@ -0,0 +1,294 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional
+
+from naver_cache import ResponseCache, make_key
+
+# ----------------------------------------------------------------------
+# GPT 가격 제안 (구조화된 JSON 출력 + 영구 캐시 + 일괄 처리 + 스트리밍 표시)
+# 같은 상품명(정규화 기준)과 모델 조합은 캐시에서 바로 돌려주므로 반복 조회 시 토큰을 쓰지 않습니다.
+#   OPENAI_API_KEY=... python gpt_pricing.py products.csv gpt_prices.csv --workers 4
+# OPENAI_BASE_URL 로 OpenAI 호환 로컬 스텁(naver_stub.py)을 가리키면 오프라인으로 확인할 수 있습니다.
+# GOREMI_API_MODE=record/replay 로 실제 응답을 카세트에 녹화/재생할 수 있습니다. (api_cassette.py)
+# 캐시는 네이버 응답 캐시와 다른 파일(GOREMI_GPT_CACHE_PATH)에 둡니다. 네이버 호출(미리 받기, 배치)이 많아도
+# 비용을 치른 GPT 결과가 공용 캐시의 LRU 한도에 밀려 지워지지 않도록 보관 건수도 따로 셉니다.
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger("gpt_pricing")
+
+MODEL = "gpt-3.5-turbo"
+CACHE_KIND = "gpt"
+CACHE_ENDPOINT = "openai/v1/chat/completions"
+DEFAULT_GPT_CACHE_PATH = os.environ.get("GOREMI_GPT_CACHE_PATH", os.path.join(".cache", "gpt_recommendations.sqlite3"))
+GPT_CACHE_MAX_ENTRIES = 20000
+
+COMPETITION_LEVELS = ("낮음", "중간", "높음")
+MARGIN_LEVELS = ("하", "중", "상")
+FIELDS = ["competition", "margin_structure", "b2c_min", "b2c_max", "b2b_min", "b2b_max", "note"]
+
+PROMPT = """
+상품명: {product_name}
+
+이 상품의 시장 경쟁 강도, 마진 구조, 적정 소비자 가격대를 GPT 데이터 기반으로 분석해줘.
+아래 키를 가진 JSON 객체 하나만 출력해줘. 가격은 원 단위 정수.
+
+{{
+  "competition": "낮음" | "중간" | "높음",
+  "margin_structure": "하" | "중" | "상",
+  "b2c_min": 적정 소비자 가격대 하한, "b2c_max": 적정 소비자 가격대 상한,
+  "b2b_min": 적정 납품 가격대 하한, "b2b_max": 적정 납품 가격대 상한,
+  "note": "간단한 근거와 전략 제안 한 줄"
+}}
+"""
+
+
+def normalize_product_name(product_name: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", product_name).split()).lower()
+
+
+def _to_int(value) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def parse_recommendation(text: str) -> Dict:
+    """모델 응답(JSON)을 검증된 dict 로 변환합니다. 형식이 맞지 않으면 ValueError."""
+    data = json.loads(text)
+    rec = {
+        "competition": data.get("competition") if data.get("competition") in COMPETITION_LEVELS else None,
+        "margin_structure": data.get("margin_structure") if data.get("margin_structure") in MARGIN_LEVELS else None,
+        "note": str(data.get("note") or "").strip(),
+    }
+    for key in ("b2c_min", "b2c_max", "b2b_min", "b2b_max"):
+        rec[key] = _to_int(data.get(key))
+    if rec["competition"] is None or rec["b2c_min"] is None or rec["b2b_min"] is None:
+        raise ValueError(f"GPT 응답 형식 오류: {text[:200]}")
+    return rec
+
+
+def format_recommendation(rec: Dict) -> str:
+    """기존 화면과 같은 5줄 요약 (마크다운)."""
+    def price_range(low, high):
+        return f"{low:,} ~ {high:,} 원" if high and high != low else f"{low:,} 원"
+    return "\n".join([
+        f"1. 경쟁강도: {rec['competition']}",
+        f"2. 마진구조: {rec.get('margin_structure') or '-'}",
+        f"3. 적정 소비자 가격대 (B2C): {price_range(rec['b2c_min'], rec.get('b2c_max'))}",
+        f"4. 적정 납품 가격대 (B2B): {price_range(rec['b2b_min'], rec.get('b2b_max'))}",
+        f"5. 비고 및 전략 제안: {rec.get('note') or '-'}",
+    ])
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """GPT 가격 제안 전용 캐시 (naver_cache.get_cache 와 파일/보관 한도가 분리됨)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(DEFAULT_GPT_CACHE_PATH, max_entries=GPT_CACHE_MAX_ENTRIES)
+        return _default_cache
+
+
+def recommend_price(client, product_name: str, model: str = MODEL, cache: Optional[ResponseCache] = None) -> Dict:
+    """구조화된 가격 제안. (정규화된 상품명, 모델) 기준으로 영구 캐시합니다."""
+    cache = cache or get_cache()
+    key = make_key(CACHE_ENDPOINT, {"product": normalize_product_name(product_name), "model": model})
+    cached = cache.get(CACHE_KIND, key)
+    if cached is not None:
+        return cached
+
+    completion = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": PROMPT.format(product_name=product_name)}],
+        temperature=0.5,
+        response_format={"type": "json_object"},
+    )
+    rec = parse_recommendation(completion.choices[0].message.content)
+    cache.set(CACHE_KIND, key, rec)
+    return rec
+
+
+# 스트리밍 중 완성된 필드를 찾는 패턴 (문자열은 닫힌 따옴표까지, 숫자는 뒤에 구분자가 올 때까지)
+_FIELD_PATTERN = re.compile(r'"(\w+)"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?=\s*[,}]))')
+_PARTIAL_NOTE_PATTERN = re.compile(r'"note"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+
+def _partial_fields(text: str) -> Dict:
+    """아직 닫히지 않은 JSON 응답에서 값이 완성된 필드와 작성 중인 note 를 뽑습니다."""
+    fields = {}
+    for key, raw in _FIELD_PATTERN.findall(text):
+        try:
+            fields[key] = json.loads(raw)
+        except ValueError:
+            continue
+    if "note" not in fields:
+        match = _PARTIAL_NOTE_PATTERN.search(text)
+        if match:
+            partial = match.group(1)
+            for end in range(len(partial), max(-1, len(partial) - 6), -1):  # 잘린 이스케이프(\u..) 는 버림
+                try:
+                    fields["note"] = json.loads(f'"{partial[:end]}"')
+                    break
+                except ValueError:
+                    continue
+    return fields
+
+
+def format_partial(fields: Dict) -> str:
+    """스트리밍 중 화면 표시용. format_recommendation 과 같은 줄을 앞에서부터 완성된 만큼만 그립니다."""
+    def price_range(low, high):
+        return f"{_to_int(low):,} ~ {_to_int(high):,} 원" if _to_int(high) and high != low else f"{_to_int(low):,} 원"
+    steps = [
+        (("competition",), lambda: f"1. 경쟁강도: {fields['competition']}"),
+        (("margin_structure",), lambda: f"2. 마진구조: {fields['margin_structure'] or '-'}"),
+        (("b2c_min", "b2c_max"), lambda: f"3. 적정 소비자 가격대 (B2C): {price_range(fields['b2c_min'], fields['b2c_max'])}"),
+        (("b2b_min", "b2b_max"), lambda: f"4. 적정 납품 가격대 (B2B): {price_range(fields['b2b_min'], fields['b2b_max'])}"),
+        (("note",), lambda: f"5. 비고 및 전략 제안: {fields['note']}"),
+    ]
+    lines = []
+    for keys, render in steps:
+        if not all(key in fields for key in keys):
+            break
+        try:
+            lines.append(render())
+        except (TypeError, ValueError):
+            break
+    return "\n".join(lines)
+
+
+class RecommendationStream:
+    """
+    가격 제안을 스트리밍으로 받으며 화면에 그릴 마크다운을 (누적 전체 텍스트로) 하나씩 내보냅니다.
+      stream = RecommendationStream(client, "타코와사비")
+      for text in stream: placeholder.markdown(text)
+    끝나면 recommendation(검증된 dict) 과 total(초) 이 채워집니다. first_token 은 내용이 담긴 조각을 받았을 때만 채워집니다.
+    캐시에 있으면 한 번에 완성본을 냅니다.
+    반복을 중간에 멈추면(close, Streamlit 재실행 등) 연결을 바로 끊고 캐시에 저장하지 않습니다.
+    """
+
+    def __init__(self, client, product_name: str, model: str = MODEL, cache: Optional[ResponseCache] = None):
+        self.client = client
+        self.product_name = product_name
+        self.model = model
+        self.cache = cache or get_cache()
+        self.recommendation: Optional[Dict] = None
+        self.first_token: Optional[float] = None
+        self.total: Optional[float] = None
+        self.cached = False
+        self.cancelled = False
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.perf_counter()
+        key = make_key(CACHE_ENDPOINT, {"product": normalize_product_name(self.product_name), "model": self.model})
+        cached = self.cache.get(CACHE_KIND, key)
+        if cached is not None:
+            self.recommendation, self.cached = cached, True
+            self.first_token = self.total = time.perf_counter() - started
+            yield format_recommendation(cached)
+            return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": PROMPT.format(product_name=self.product_name)}],
+            temperature=0.5,
+            response_format={"type": "json_object"},
+            stream=True,
+        )
+        text, shown = "", ""
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if self.first_token is None:
+                    self.first_token = time.perf_counter() - started
+                text += delta
+                rendered = format_partial(_partial_fields(text))
+                if rendered != shown:
+                    shown = rendered
+                    yield rendered
+        except GeneratorExit:
+            self.cancelled = True
+            raise
+        finally:
+            stream.close()
+            self.total = time.perf_counter() - started
+            if self.cancelled:
+                logger.info("%s 스트리밍 취소 (%.2fs)", self.product_name, self.total)
+
+        self.recommendation = parse_recommendation(text)
+        self.cache.set(CACHE_KIND, key, self.recommendation)
+        logger.info("%s 첫 토큰 %.2fs, 전체 %.2fs", self.product_name, self.first_token or self.total, self.total)
+        final = format_recommendation(self.recommendation)
+        if final != shown:
+            yield final
+
+
+def recommend_prices(client, product_names: Iterable[str], model: str = MODEL, workers: int = 4) -> Dict[str, object]:
+    """
+    여러 상품을 동시에 (최대 workers 건) 처리합니다. 정규화 기준으로 같은 상품은 한 번만 요청합니다.
+    반환: {상품명: 제안 dict 또는 Exception}
+    """
+    names = list(dict.fromkeys(product_names))
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize_product_name(name), name)
+
+    def attempt(name):
+        try:
+            return recommend_price(client, name, model)
+        except Exception as e:  # 한 상품 실패가 전체를 멈추지 않도록 결과에 담아 반환
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(unique, pool.map(attempt, unique.values())))
+    return {name: results[normalize_product_name(name)] for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT 가격 제안 일괄 처리")
+    parser.add_argument("input", help="입력 CSV (product 열)")
+    parser.add_argument("output", help="결과 CSV")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from openai import OpenAI
+
+    from api_cassette import openai_http_client
+
+    with open(args.input, newline="", encoding="utf-8-sig") as f:
+        products = [row["product"].strip() for row in csv.DictReader(f) if (row.get("product") or "").strip()]
+
+    results = recommend_prices(OpenAI(http_client=openai_http_client()), products, args.model, args.workers)
+    failed = 0
+    with open(args.output, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=["product"] + FIELDS + ["error"])
+        writer.writeheader()
+        for product, rec in results.items():
+            if isinstance(rec, Exception):
+                failed += 1
+                writer.writerow({"product": product, "error": str(rec)})
+            else:
+                writer.writerow(dict(rec, product=product))
+    logger.info("완료: %d건, 실패 %d건", len(results), failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
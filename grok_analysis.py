@@ -0,0 +1,267 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from naver_fetch import build_competitiveness_calls, fetch_all, retry_failed
+from shop_listings import OUR_BRAND_ALIASES, cluster_listings, normalize_listings
+
+# ----------------------------------------------------------------------
+# Grok variant analysis backend (shop/trend/insight/blog/cafe -> 4 scores)
+# Kept free of Streamlit so batch jobs and benchmarks can import it; the page
+# routes warnings to the screen with set_notifier(st.warning, st.error).
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+_notify = {"warning": logger.warning, "error": logger.error}
+
+
+def set_notifier(warning, error):
+    _notify["warning"] = warning
+    _notify["error"] = error
+
+
+# Company brands (aliases/English spellings live in shop_listings.OUR_BRAND_ALIASES)
+OUR_BRANDS = list(OUR_BRAND_ALIASES)
+
+# Per-call timeout (seconds) for the concurrent fetch stage
+API_TIMEOUT = 10.0
+
+
+def get_naver_headers(client_id: str, client_secret: str) -> Dict[str, str]:
+    return {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret
+    }
+
+# Weight of each endpoint in the confidence value. shop drives two scores (competition, rarity)
+# and is the demand proxy when insight is missing; the others each back one half of one score.
+SIGNAL_WEIGHTS = {"shop": 0.3, "trend": 0.2, "insight": 0.2, "blog": 0.15, "cafe": 0.15}
+SIGNAL_LABELS = {"shop": "쇼핑 검색", "trend": "검색 트렌드", "insight": "쇼핑 인사이트", "blog": "블로그", "cafe": "카페"}
+
+
+def _mean(values: List[float], default: float = 0.5) -> float:
+    return sum(values) / len(values) if values else default
+
+
+def estimate_scores() -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+    """Estimation mode: fixed new-product assumptions, used only when forced or when no signal is available."""
+    scores = {"rarity": 0.7, "popularity": 0.4, "demand": 0.6, "competition": 0.5}
+    evidences = {
+        "추정 모드": [
+            "신제품으로 가정하여 희소성 높음 (0.7)",
+            "초기 인기 중간 수준 (0.4)",
+            "시장 수요 성장 예상 (0.6)",
+            "경쟁 중간 (0.5)"
+        ]
+    }
+    _notify["warning"]("데이터 부족으로 추정 모드 사용. 실제 데이터 입력 추천.")
+    return scores, evidences
+
+
+def analyze_competitiveness(product_name: str, client_id: str, client_secret: str, category_id: str = "50000008") -> Dict:
+    """
+    Fetch the five signals, retry only the failed endpoints (with backoff), and score from whatever succeeded.
+    Returns {"scores", "evidences", "signals": {name: {ok, status, attempts, error}}, "confidence"}.
+    A score whose signals are all missing stays at the neutral 0.5; confidence is the weighted share of
+    signals that arrived (SIGNAL_WEIGHTS), so 1.0 means the same result as a fully successful run.
+    """
+    evidences = {
+        "쇼핑 검색 결과": [],
+        "검색 트렌드": [],
+        "쇼핑 인사이트": [],
+        "블로그 포스트": [],
+        "카페 아티클": []
+    }  # Categorized evidences
+
+    headers = get_naver_headers(client_id, client_secret)
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+
+    # All five endpoints are fired at once; wall-clock is roughly the slowest single call.
+    # Failed endpoints are then re-sent on their own, keeping every signal that already arrived.
+    calls = build_competitiveness_calls(product_name, headers, category_id, start_date, end_date)
+    results = fetch_all(calls, timeout=API_TIMEOUT)
+    attempts = retry_failed(calls, results, timeout=API_TIMEOUT)
+    signals = {
+        name: {"ok": result.ok, "status": result.status_code, "attempts": attempts[name], "error": result.error}
+        for name, result in results.items()
+    }
+
+    competition = rarity = None
+    popularity_parts: List[float] = []
+    demand_parts: List[float] = []
+    demand_proxy = None
+
+    # 1. Shop Search API for competition and rarity
+    result = results["shop"]
+    if result.ok:
+        data = result.data
+        total_results = data.get("total", 0)
+        competition = min(total_results / 10000, 1.0)
+        rarity = 1 - competition
+        # Evidences: top 15 distinct products (same listing across malls collapsed, brand aliases matched)
+        clusters = cluster_listings(normalize_listings(data.get("items", [])))
+        for cluster in clusters[:15]:
+            label = "자사 제품" if cluster["own"] else "경쟁 제품"
+            malls = f", 판매처 {len(cluster['malls'])}곳" if len(cluster["malls"]) > 1 else ""
+            evidences["쇼핑 검색 결과"].append(f"{label}: {cluster['title']} (링크: {cluster['link']}{malls})")
+        # Proxy for demand if insight is missing or empty: high search results imply demand
+        if total_results > 0:
+            demand_proxy = min(total_results / 5000, 1.0)
+
+    # 2. Datalab Search Trend for popularity (search volume)
+    result = results["trend"]
+    if result.ok:
+        trend_results = result.data.get("results", [{}])[0].get("data", [])
+        if trend_results:
+            avg_ratio = sum(item["ratio"] for item in trend_results) / len(trend_results)
+            popularity_parts.append(min(avg_ratio / 100, 1.0))
+            # Evidences: all monthly ratios (up to 12 for 1 year)
+            for item in trend_results:
+                evidences["검색 트렌드"].append(f"{item['period']} - 검색 비율 {item['ratio']}")
+        else:
+            popularity_parts.append(0.5)
+
+    # 3. Datalab Shopping Insight for demand (use 'ratio' for click share)
+    result = results["insight"]
+    insight_results = result.data.get("results", [{}])[0].get("data", []) if result.ok else []
+    if insight_results:
+        avg_ratio = sum(item.get("ratio", 0) for item in insight_results) / len(insight_results)
+        demand_parts.append(min(avg_ratio / 100, 1.0))  # ratio is click share percentage
+        # Evidences: all click shares (up to 12)
+        for item in insight_results:
+            evidences["쇼핑 인사이트"].append(f"{item['period']} - 클릭 비율 {item.get('ratio', 'N/A')}")
+    elif demand_proxy is not None:
+        demand_parts.append(demand_proxy)
+    elif result.ok:
+        demand_parts.append(0.5)
+
+    # 4. Blog Search for additional popularity/demand (reviews, mentions)
+    result = results["blog"]
+    if result.ok:
+        # Adjust popularity with blog mentions (proxy for buzz/reviews)
+        popularity_parts.append(min(result.data.get("total", 0) / 10000, 1.0))
+        # Evidences: top 10 blog posts
+        for item in result.data.get("items", [])[:10]:
+            evidences["블로그 포스트"].append(f"{item['title']} (링크: {item['link']})")
+
+    # 5. Cafe Search for additional demand (community discussions)
+    result = results["cafe"]
+    if result.ok:
+        # Adjust demand with cafe mentions (proxy for interest/purchases)
+        demand_parts.append(min(result.data.get("total", 0) / 10000, 1.0))
+        # Evidences: top 10 cafe articles
+        for item in result.data.get("items", [])[:10]:
+            evidences["카페 아티클"].append(f"{item['title']} (링크: {item['link']})")
+
+    scores = {
+        "rarity": 0.5 if rarity is None else rarity,
+        "popularity": _mean(popularity_parts),
+        "demand": _mean(demand_parts),
+        "competition": 0.5 if competition is None else competition,
+    }
+    confidence = round(sum(weight for name, weight in SIGNAL_WEIGHTS.items() if signals[name]["ok"]), 2)
+
+    # Limit total evidences to 50 by trimming each category if needed
+    total_evidences = sum(len(lst) for lst in evidences.values())
+    if total_evidences > 50:
+        for key in evidences:
+            evidences[key] = evidences[key][:max(1, len(evidences[key]) * 50 // total_evidences)]
+
+    return {"scores": scores, "evidences": evidences, "signals": signals, "confidence": confidence}
+
+
+def describe_missing_signals(report: Dict) -> List[str]:
+    """One line per signal that never arrived, e.g. '카페: HTTP 503 (3회 시도)'."""
+    return [
+        f"{SIGNAL_LABELS.get(name, name)}: {signal['error'] or signal['status']} ({signal['attempts']}회 시도)"
+        for name, signal in report["signals"].items() if not signal["ok"]
+    ]
+
+
+def analyze_product_competitiveness(product_name: str, client_id: str, client_secret: str, category_id: str = "50000008", fallback_mode: bool = False) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+    """
+    Analyze using Naver APIs including blog and cafe. Return scores and categorized evidences (up to 50 total).
+    Demand uses 'ratio' from shopping insight (click share percentage).
+    Default category_id set to 50000008 for food products.
+    Signals that still fail after retries are left out of the scores and listed under '데이터 상태';
+    estimation mode is used only when forced or when no signal arrived at all.
+    """
+    if fallback_mode:
+        return estimate_scores()
+
+    try:
+        report = analyze_competitiveness(product_name, client_id, client_secret, category_id)
+    except Exception as e:
+        _notify["error"](f"API 호출 중 오류: {str(e)}")
+        return estimate_scores()
+    if report["confidence"] <= 0:
+        return estimate_scores()
+    evidences = report["evidences"]
+    missing = describe_missing_signals(report)
+    if missing:
+        _notify["warning"](f"일부 데이터 없이 분석했습니다 (신뢰도 {report['confidence']:.0%}): " + ", ".join(missing))
+        evidences["데이터 상태"] = [f"신뢰도 {report['confidence']:.0%}"] + [f"누락 - {line}" for line in missing]
+    return report["scores"], evidences
+
+def suggest_margin(analysis: Dict[str, float]) -> float:
+    avg_score = (analysis["rarity"] + analysis["popularity"] + analysis["demand"] - analysis["competition"]) / 4
+    margin = avg_score * 50
+    return max(10, min(40, margin))
+
+def generate_summary(analysis: Dict[str, float], margin: float) -> str:
+    """
+    Generate a summary for the recommended margin.
+    """
+    rarity = analysis["rarity"]
+    popularity = analysis["popularity"]
+    demand = analysis["demand"]
+    competition = analysis["competition"]
+    
+    reasons = []
+    if rarity > 0.7:
+        reasons.append("높은 희소성으로 인해 프리미엄 가격 전략이 가능합니다.")
+    elif rarity < 0.3:
+        reasons.append("희소성이 낮아 마진을 보수적으로 설정하였습니다.")
+    
+    if popularity > 0.7:
+        reasons.append("높은 인기로 인해 수요가 안정적입니다.")
+    elif popularity < 0.3:
+        reasons.append("인기가 낮아 마케팅 강화가 필요합니다.")
+    
+    if demand > 0.7:
+        reasons.append("강한 수요로 인해 높은 마진을 적용할 수 있습니다.")
+    elif demand < 0.3:
+        reasons.append("수요가 약해 마진을 조정하였습니다.")
+    
+    if competition > 0.7:
+        reasons.append("치열한 경쟁으로 인해 마진을 낮춰 경쟁력을 확보합니다.")
+    elif competition < 0.3:
+        reasons.append("낮은 경쟁으로 인해 여유로운 마진 설정이 가능합니다.")
+    
+    summary = f"추천 마진율 {margin:.1f}%는 제품의 희소성({rarity:.2f}), 인기({popularity:.2f}), 수요({demand:.2f}), 경쟁({competition:.2f})을 종합적으로 평가하여 산출되었습니다. "
+    summary += " ".join(reasons) + " 이 마진은 시장 경쟁력과 수익성을 균형 있게 고려한 결과입니다."
+    return summary
+
+def calculate_prices(cost_price: float, margin: float) -> Dict[str, float]:
+    """
+    Calculate prices based on cost and margin (VAT excluded).
+    Apply suggested margin to wholesale price.
+    - Wholesale price: cost / (1 - margin/100)
+    - Business member price: wholesale * 1.2 (example multiplier; customize)
+    - Retail price: wholesale * 1.5 (example multiplier; customize)
+    Prices rounded to nearest integer (no decimals).
+    """
+    if cost_price <= 0:
+        return {}
+    
+    wholesale_price = cost_price / (1 - margin / 100)
+    business_price = wholesale_price * 1.2  # Example: 20% markup from wholesale
+    retail_price = wholesale_price * 1.5    # Example: 50% markup from wholesale
+    
+    return {
+        "도매단가": round(wholesale_price),
+        "사업자회원가": round(business_price),
+        "일반소비자가": round(retail_price)
+    }
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# ----------------------------------------------------------------------
+# import 시간 예산 검사 (컨테이너 콜드 스타트 / 배치 워커 기동 시간)
+# 모듈마다 새 파이썬 프로세스에서 import 에 걸린 시간을 여러 번 재서 중앙값을 예산과 비교하고,
+# 분석 백엔드가 무거운 모듈(HEAVY_MODULES)을 import 시점에 불러오지 않는지 확인합니다.
+#   python import_budget.py               # 예산 초과나 무거운 모듈 로드가 있으면 종료코드 1
+#   python import_budget.py --profile     # 모듈별 -X importtime 상위 항목 출력
+#   python import_budget.py --scale 2     # 느린 CI 장비에서는 예산을 배수로 늘려서 검사
+# ----------------------------------------------------------------------
+
+# 모듈 -> import 시간 예산(ms). requests(~80ms)를 포함한 값이며, pandas/numpy 를 다시 top-level 로 올리면 넘습니다.
+BUDGETS_MS = {
+    "naver_analysis": 250,
+    "grok_analysis": 250,
+    "google_analysis": 250,
+    "batch_pricing": 250,
+    "pricing_service": 300,
+    "gpt_pricing": 100,
+    "price_stats": 50,
+    "margin_simulation": 50,
+}
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "pyarrow", "matplotlib", "playwright", "openai", "httpx")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{"ms": elapsed, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(module, repeat=5):
+    """새 인터프리터에서 repeat 번 import 해서 (중앙값 ms, import 된 무거운 모듈 목록) 을 반환합니다."""
+    samples, heavy = [], []
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])),
+               PYTHONDONTWRITEBYTECODE="1")
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                cwd=here, env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy = result["heavy"]
+    return statistics.median(samples), heavy
+
+
+def profile(module, top=10):
+    """-X importtime 출력에서 누적 시간이 큰 순서로 top 개 (누적 us, 모듈명)."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 예산 검사")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="검사할 모듈 (기본: BUDGETS_MS 전체)")
+    parser.add_argument("--repeat", type=int, default=5, help="모듈마다 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배수")
+    parser.add_argument("--profile", action="store_true", help="-X importtime 상위 항목 출력")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        budget = BUDGETS_MS.get(module, max(BUDGETS_MS.values())) * args.scale
+        ms, heavy = measure(module, args.repeat)
+        status = "ok" if ms <= budget and not heavy else "FAIL"
+        print(f"{module:<20}{ms:>8.1f} ms / {budget:>6.0f} ms  {status}" + (f"  heavy: {', '.join(heavy)}" if heavy else ""))
+        if ms > budget:
+            failures.append(f"{module}: {ms:.1f} ms > {budget:.0f} ms")
+        if heavy:
+            failures.append(f"{module}: import 시점에 {', '.join(heavy)} 로드")
+        if args.profile:
+            for cumulative, name in profile(module):
+                print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+    for line in failures:
+        print(f"OVER BUDGET {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+# ----------------------------------------------------------------------
+# 다중 키워드 동시 매칭 (Aho-Corasick)
+# 여러 키워드 그룹을 오토마톤 하나로 묶어, 텍스트를 한 번만 읽고 그룹별 매칭 키워드를 찾습니다.
+# ----------------------------------------------------------------------
+
+
+class KeywordScanner:
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+        self.groups = {group: list(dict.fromkeys(keywords)) for group, keywords in groups.items()}
+        for group, keywords in self.groups.items():
+            for keyword in keywords:
+                if keyword:
+                    self._add(keyword, group)
+        self._link()
+
+    def _add(self, keyword: str, group: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((group, keyword))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """텍스트를 한 번 훑어 {그룹: 매칭된 키워드 집합} 을 반환합니다. (매칭 없는 그룹도 빈 집합으로 포함)"""
+        hits: Dict[str, Set[str]] = {group: set() for group in self.groups}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for group, keyword in out[state]:
+                hits[group].add(keyword)
+        return hits
+
+
+# ----------------------------------------------------------------------
+# Google 검색 결과 분석용 신호 추출
+# ----------------------------------------------------------------------
+
+DEMAND_KEYWORDS = ['후기', '리뷰', '레시피', '만들기', '맛집', '추천', '인기']
+COMPETITOR_KEYWORDS = ['판매', '구매', '쇼핑', '마켓', '가격']
+SHORTAGE_KEYWORDS = ['급등', '인상', '부족', '어획량 감소', '수급 불안']
+
+# '숫자,숫자원' 또는 '숫자원' 형태의 가격 정보
+PRICE_PATTERN = re.compile(r'([\d,]+)원')
+
+
+def estimate_raw_materials(product_name: str) -> List[str]:
+    # 이 부분은 실제 사내 시스템에서는 '제품별 원재료 구성표' DB와 연동해야 합니다.
+    if '타코와사비' in product_name:
+        return ['문어', '고추냉이']
+    return [product_name]  # 일반적인 경우 제품명 자체를 원재료로 간주
+
+
+@lru_cache(maxsize=256)
+def _signal_scanner(raw_materials: tuple) -> KeywordScanner:
+    return KeywordScanner({
+        "demand": DEMAND_KEYWORDS,
+        "competitor": COMPETITOR_KEYWORDS,
+        "shortage": SHORTAGE_KEYWORDS,
+        "material": raw_materials,
+    })
+
+
+def extract_prices(text: str) -> List[int]:
+    prices = []
+    for price_str in PRICE_PATTERN.findall(text):
+        try:
+            # 쉼표 제거 후 숫자로 변환
+            price_num = int(price_str.replace(',', ''))
+        except ValueError:
+            continue
+        # 너무 비현실적인 가격은 제외 (예: 100원 미만, 100만원 초과)
+        if 100 < price_num < 1000000:
+            prices.append(price_num)
+    return prices
+
+
+def scan_search_results(product_name: str, search_results: List[Dict]) -> List[Dict]:
+    """
+    각 검색 결과(title + snippet)를 한 번만 훑어 수요/경쟁/원재료/수급 신호와 가격을 함께 뽑습니다.
+    가격 정규식은 경쟁(판매처) 신호가 있는 결과에만 적용합니다.
+    """
+    scanner = _signal_scanner(tuple(estimate_raw_materials(product_name)))
+    signals = []
+    for result in search_results:
+        combined_text = result.get('title', '') + result.get('snippet', '')
+        hits = scanner.scan(combined_text)
+        hits["prices"] = extract_prices(combined_text) if hits["competitor"] else []
+        signals.append(hits)
+    return signals
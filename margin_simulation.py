@@ -0,0 +1,136 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+# ----------------------------------------------------------------------
+# 제안 마진의 불확실성 구간 (몬테카를로)
+# 점수 하나하나가 적은 표본(데이터랩 12개월, 검색 결과 10~40건)에서 나온 값이라, 같은 상품도 조회 때마다 흔들립니다.
+# 점수마다 근거에 맞춘 분포에서 수만 개 표본을 뽑아 suggest_margin 과 같은 식을 NumPy 로 한 번에 계산하고
+# 마진/판매가의 P10/P50/P90 을 돌려줍니다. (2만 표본 기준 수 ms, 화면 안에서 바로 계산)
+#   - 데이터랩 월별 ratio: 해당 구간의 달을 복원추출(bootstrap)해 점수 식을 다시 계산
+#   - 건수(경쟁 상품 수, 뉴스 건수): 관측 건수 k 에 맞춘 감마-포아송 (λ ~ Gamma(k + 0.5), 건수 ~ Poisson(λ))
+#     검색이 display 개까지만 돌려주므로 상한(cap)에 닿은 관측은 '그 이상'(하한)이라 다시 뽑지 않고,
+#     상한 아래 관측도 상한을 넘는 표본은 상한으로 자릅니다. (구간이 점 추정값 한쪽으로만 쏠리지 않도록)
+#   - 검색 결과 기반 점수(Google): 검색 결과 자체를 복원추출해 키워드 신호 건수를 다시 셈
+#   - 경쟁 가격 중앙값: 중앙값의 표준오차(1.2533·σ/√n, σ ≈ IQR/1.349)를 쓴 정규분포
+# 근거가 없는 점수는 점 추정값 그대로 둡니다. 모든 점수를 고정하면 suggest_margin 과 같은 값이 나옵니다.
+# NumPy 는 처음 계산할 때 불러옵니다. (분석 백엔드 import 시간 예산 유지)
+# ----------------------------------------------------------------------
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_SAMPLES = 20000
+BAND_PERCENTILES = (10, 50, 90)
+
+Samples = Union[float, "np.ndarray"]
+
+
+def make_rng(seed: Optional[int] = None) -> "np.random.Generator":
+    import numpy as np
+    return np.random.default_rng(seed)
+
+
+def bootstrap_trend_scores(ratios: Sequence[float], size: int, rng: "np.random.Generator") -> "np.ndarray":
+    """naver_analysis.analyze_search_trend 의 점수(최근 3개월 vs 그 전 3개월)를 달 복원추출로 다시 계산합니다."""
+    import numpy as np
+    values = np.asarray(ratios, dtype=np.float64)
+    recent_months = values[-3:]
+    recent = recent_months[rng.integers(0, recent_months.size, (size, recent_months.size))].mean(axis=1)
+    if values.size > 3:
+        past_months = values[-6:-3]
+        past = past_months[rng.integers(0, past_months.size, (size, past_months.size))].mean(axis=1)
+    else:
+        past = recent
+    score = 5.0 + 3.0 * (recent > past * 1.2) - 2.0 * (recent < past * 0.8)
+    return np.clip(score, 1.0, 10.0)
+
+
+def bootstrap_market_size_scores(ratios: Sequence[float], size: int, rng: "np.random.Generator") -> "np.ndarray":
+    """naver_analysis.analyze_shopping_insight 의 점수 log(Σratio + 1)·2 를 달 복원추출로 다시 계산합니다."""
+    import numpy as np
+    values = np.asarray(ratios, dtype=np.float64)
+    totals = values[rng.integers(0, values.size, (size, values.size))].sum(axis=1)
+    return np.clip(np.log(totals + 1.0) * 2.0, 1.0, 10.0)
+
+
+def sample_counts(observed: float, size: int, rng: "np.random.Generator",
+                  cap: Optional[float] = None) -> "np.ndarray":
+    """
+    관측 건수 observed 에 맞춘 감마-포아송 표본 (0건이어도 분산이 0 이 되지 않음).
+    cap: 관측할 수 있는 최대 건수. observed 가 cap 이상이면 실제 건수는 그 이상이므로 observed 그대로(하한),
+    아니면 표본을 cap 에서 자릅니다.
+    """
+    import numpy as np
+    observed = max(observed, 0.0)
+    if cap is not None and observed >= cap:
+        return np.full(size, float(observed))
+    counts = rng.poisson(rng.gamma(observed + 0.5, 1.0, size))
+    return counts if cap is None else np.minimum(counts, cap)
+
+
+def sample_median(median: Optional[float], p25: Optional[float], p75: Optional[float], count: int,
+                  size: int, rng: "np.random.Generator") -> Samples:
+    """가격 중앙값 표본. 중앙값이 없으면 0(=가격 상한 조정 안 함), 분위수가 없으면 점 추정값 그대로."""
+    import numpy as np
+    if not median or median <= 0:
+        return 0.0
+    if p25 is None or p75 is None or count < 2:
+        return float(median)
+    stderr = 1.2533 * ((p75 - p25) / 1.349) / np.sqrt(count)
+    return np.maximum(rng.normal(median, stderr, size), 0.0)
+
+
+def _final_price(margin: "np.ndarray", base_cost: float, reference: Samples,
+                 min_margin: float) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    suggest_margin 의 공통 마무리: 제안가 -> 경쟁가 130% 상한(120% 로 조정, 최소 마진 가격 아래로는 안 내림)
+    -> 100원 단위(최소 마진 아래면 올림) -> 실제 마진.
+    """
+    import numpy as np
+    floor_price = base_cost / (1 - min_margin / 100)
+    price = np.floor(base_cost / (1 - (margin / 100)))
+    reference = np.broadcast_to(np.asarray(reference, dtype=np.float64), price.shape)
+    capped = (reference > 0) & (price > reference * 1.3)
+    price = np.where(capped, np.maximum(np.floor(reference * 1.2), np.ceil(floor_price)), price)
+    final_price = np.round(price / 100) * 100
+    final_price = np.where(final_price < floor_price, np.ceil(floor_price / 100) * 100, final_price)
+    final_margin = np.where(final_price > 0, (1 - base_cost / np.where(final_price > 0, final_price, 1.0)) * 100, 0.0)
+    return final_margin, final_price
+
+
+def naver_margin_samples(trend: Samples, market_size: Samples, competition: Samples, rarity: Samples,
+                         base_cost: float, competitor_median: Samples = 0.0) -> Tuple["np.ndarray", "np.ndarray"]:
+    """naver_analysis.suggest_margin 의 벡터 버전 (각 인자는 스칼라 또는 같은 길이의 배열)."""
+    import numpy as np
+    margin = 35.0 + (np.asarray(trend) - 5) * 1.5 + (np.asarray(market_size) - 5) * 1.0 \
+        + (np.asarray(rarity) - 5) * 1.0 - (np.asarray(competition) - 5) * 1.5
+    return _final_price(np.atleast_1d(np.clip(margin, 15.0, 70.0)), base_cost, competitor_median, 15.0)
+
+
+def google_margin_samples(demand: Samples, competition: Samples, rarity: Samples, base_cost: float,
+                          avg_price: Samples = 0.0) -> Tuple["np.ndarray", "np.ndarray"]:
+    """google_analysis.suggest_margin 의 벡터 버전."""
+    import numpy as np
+    margin = 30.0 + (np.asarray(demand) - 5) * 1.0 + (np.asarray(rarity) - 5) * 1.0 - (np.asarray(competition) - 5) * 1.0
+    return _final_price(np.atleast_1d(np.clip(margin, 10.0, 70.0)), base_cost, avg_price, 10.0)
+
+
+def summarize(margins: "np.ndarray", prices: "np.ndarray") -> Dict:
+    """{"samples", "margin": {p10, p50, p90}, "price": {p10, p50, p90}} - 판매가는 실제 표본값(100원 단위)."""
+    import numpy as np
+    margin_bands = np.percentile(margins, BAND_PERCENTILES)
+    price_bands = np.percentile(prices, BAND_PERCENTILES, method="inverted_cdf")
+    return {
+        "samples": int(np.size(margins)),
+        "margin": {f"p{pct}": float(value) for pct, value in zip(BAND_PERCENTILES, margin_bands)},
+        "price": {f"p{pct}": int(value) for pct, value in zip(BAND_PERCENTILES, price_bands)},
+    }
+
+
+def describe_bands(bands: Dict) -> List[str]:
+    """화면 표시용 요약 문장."""
+    margin, price = bands["margin"], bands["price"]
+    return [
+        f"마진율 P10 {margin['p10']:.1f}% · P50 **{margin['p50']:.1f}%** · P90 {margin['p90']:.1f}%",
+        f"판매가 P10 {price['p10']:,}원 · P50 **{price['p50']:,}원** · P90 {price['p90']:,}원",
+        f"(근거 표본을 다시 뽑아 {bands['samples']:,}회 계산한 범위)",
+    ]
@@ -0,0 +1,92 @@
+import numpy as np
+
+# ----------------------------------------------------------------------
+# 신제품 마진 조견표
+# 6개 요인(3x3x3x3x2x2 = 324 조합)의 제안 마진율을 한 번에 미리 계산해 두고,
+# (제조원가 x 조합) 격자의 도매/소비자 단가를 벡터 연산으로 계산합니다.
+# ----------------------------------------------------------------------
+
+# 요소별 점수표 (20~70% 범위 고려)
+competition_margin = {"낮음": 0.10, "보통": 0.00, "높음": -0.10}
+demand_margin = {"높음": 0.10, "보통": 0.00, "낮음": -0.10}
+scale_margin = {"소량": 0.10, "중간": 0.00, "대량": -0.10}
+production_margin = {"적음": 0.10, "중간": 0.00, "높음": -0.05}
+ingredient_margin = {"예": -0.10, "아니오": 0.00}
+retail_margin = {"예": 0.10, "아니오": 0.00}
+
+BASE_MARGIN = 0.45  # 기준점 (45%)
+MIN_MARGIN, MAX_MARGIN = 0.20, 0.70
+RETAIL_MARKUP = {"예": 1.5, "아니오": 1.2}  # 리테일용이면 도매가 x1.5, 아니면 x1.2
+
+# calc_suggested_margin 인자 순서와 같은 순서의 (인자 이름, 표시 이름, 점수표)
+FACTORS = [
+    ("competition", "경쟁강도", competition_margin),
+    ("demand", "수요예상", demand_margin),
+    ("scale", "생산규모", scale_margin),
+    ("prod_scale", "하루 생산량", production_margin),
+    ("ingredient", "식자재용", ingredient_margin),
+    ("retail", "리테일용", retail_margin),
+]
+FACTOR_LEVELS = [list(table) for _, _, table in FACTORS]
+RETAIL_AXIS = [name for name, _, _ in FACTORS].index("retail")
+
+
+def _build_margin_table():
+    total = np.full([len(levels) for levels in FACTOR_LEVELS], BASE_MARGIN)
+    for axis, (_, _, table) in enumerate(FACTORS):
+        shape = [1] * len(FACTORS)
+        shape[axis] = len(table)
+        total = total + np.array(list(table.values())).reshape(shape)
+    return np.round(np.clip(total, MIN_MARGIN, MAX_MARGIN), 4)
+
+
+# shape (3, 3, 3, 3, 2, 2) 제안 마진율 조견표
+MARGIN_TABLE = _build_margin_table()
+
+
+def combo_index(competition, demand, scale, prod_scale, ingredient, retail):
+    values = (competition, demand, scale, prod_scale, ingredient, retail)
+    return tuple(levels.index(value) for levels, value in zip(FACTOR_LEVELS, values))
+
+
+def calc_suggested_margin(competition, demand, scale, prod_scale, ingredient, retail):
+    return float(MARGIN_TABLE[combo_index(competition, demand, scale, prod_scale, ingredient, retail)])
+
+
+def calc_prices(cogs, margin, retail_markup):
+    """
+    cogs/margin/retail_markup 은 브로드캐스트 가능한 배열.
+    도매 = round(원가 / (1 - 마진), -1), 소비자 = round(도매 x 배수, -1)
+    """
+    wholesale = np.round(np.asarray(cogs, dtype=np.float64) / (1 - np.asarray(margin, dtype=np.float64)), -1)
+    retail_price = np.round(wholesale * np.asarray(retail_markup, dtype=np.float64), -1)
+    return wholesale, retail_price
+
+
+def price_grid(cogs_values):
+    """
+    제조원가 배열 x 324 조합 전체의 (도매, 소비자) 단가.
+    반환 shape: (len(cogs), 3, 3, 3, 3, 2, 2)
+    """
+    cogs = np.asarray(cogs_values, dtype=np.float64).reshape((-1,) + (1,) * len(FACTORS))
+    markup_shape = [1] * len(FACTORS)
+    markup_shape[RETAIL_AXIS] = len(RETAIL_MARKUP)
+    markup = np.array([RETAIL_MARKUP[level] for level in FACTOR_LEVELS[RETAIL_AXIS]]).reshape(markup_shape)
+    return calc_prices(cogs, MARGIN_TABLE[None, ...], markup[None, ...])
+
+
+def factor_sensitivity(cogs_values):
+    """
+    요인별 수준마다 (나머지 요인 전체 조합 x 원가 격자) 평균 소비자 단가와
+    전체 평균 대비 차이를 계산합니다. 반환: [(표시 이름, 수준, 평균 도매가, 평균 소비자가, 전체 평균 대비 차이)]
+    """
+    wholesale, retail_price = price_grid(cogs_values)
+    overall = retail_price.mean()
+    rows = []
+    for axis, (_, label, table) in enumerate(FACTORS):
+        other_axes = tuple(a for a in range(retail_price.ndim) if a != axis + 1)
+        level_wholesale = wholesale.mean(axis=other_axes)
+        level_retail = retail_price.mean(axis=other_axes)
+        for level, w, r in zip(table, level_wholesale, level_retail):
+            rows.append((label, level, float(w), float(r), float(r - overall)))
+    return rows
@@ -0,0 +1,221 @@
+import logging
+import math
+import json
+from array import array
+
+import requests
+
+from datalab_batcher import datalab_request
+from naver_cache import cached_call
+from margin_simulation import (
+    DEFAULT_SAMPLES, bootstrap_market_size_scores, bootstrap_trend_scores, make_rng, naver_margin_samples,
+    sample_counts, sample_median, summarize,
+)
+from naver_client import NAVER_API_BASE, get_client
+from shop_listings import competitor_summary, normalize_listings
+from stage_timing import span
+from trend_store import monthly_series
+
+# ----------------------------------------------------------------------
+# 네이버 데이터랩/검색 API 기반 분석 백엔드
+# Streamlit 없이도 import 할 수 있도록 UI 와 분리했습니다. (배치 실행, 외부 호출용)
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# 오류/경고 출력 대상. 기본은 로깅이며, Streamlit 화면에서는 set_notifier(st.warning, st.error)로 교체
+_notify = {"warning": logger.warning, "error": logger.error}
+
+
+def set_notifier(warning, error):
+    _notify["warning"] = warning
+    _notify["error"] = error
+
+# ----------------------------------------------------------------------
+# 0. 네이버 API 호출 공통 모듈
+# ----------------------------------------------------------------------
+
+def get_naver_headers(client_id, client_secret):
+    return {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret,
+        "Content-Type": "application/json",
+    }
+
+# [개선] 쇼핑 검색 시 가격 정보(lprice)도 함께 반환하도록 수정
+# 검색 결과가 0건이면 [], API 오류로 받지 못하면 None 을 반환합니다. (배치는 None 만 실패로 다시 시도)
+def search_naver(query, headers, endpoint="shop"):
+    url = f"{NAVER_API_BASE}/v1/search/{endpoint}.json"
+    params = {"query": query, "display": 10, "sort": "sim"} # 관련도순으로 10개 조회
+    def fetch():
+        response = get_client().get(url, headers=headers, params=params)
+        if response.status_code != 200:
+            _notify["warning"](f"네이버 {endpoint} 검색 API 오류: {response.status_code} - {response.text}")
+            return response.status_code, None
+        return 200, response.json()
+    try:
+        # 같은 쿼리는 디스크 캐시(TTL)에서 바로 응답
+        with span(f"fetch:{endpoint}"):
+            status, data, _ = cached_call(url, params, fetch)
+        if status != 200:
+            return None
+        
+        items = data.get('items', [])
+        # 근거 자료로 활용하기 위해 원본 데이터를 가공하여 반환 (쇼핑 결과는 자사 브랜드/중복 묶음 키도 채움)
+        with span("normalize"):
+            normalize_listings(items, classify=(endpoint == "shop"))
+        return items
+    except requests.exceptions.RequestException as e:
+        _notify["error"](f"네이버 {endpoint} 검색 API 연동 중 오류: {e}")
+        return None
+
+def call_datalab_api(api_url, headers, body, group_field=None):
+    def fetch():
+        response = get_client().post(api_url, headers=headers, data=json.dumps(body, ensure_ascii=False).encode("utf-8"))
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, response.json()
+    try:
+        # 같은 기간/키워드의 데이터랩 응답은 하루 동안 캐시에서 재사용
+        if group_field:
+            # 단일 상품 요청은 다른 상품 요청과 한 번에 묶어서 전송 (최대 5개 그룹)
+            status, data = datalab_request(api_url, headers, body, group_field)
+        else:
+            status, data, _ = cached_call(api_url, body, fetch)
+        if status != 200:
+            # 오류 메시지를 UI에 직접 표시하지 않고, 호출한 함수에서 처리하도록 None 반환
+            return None
+        return data
+    except requests.exceptions.RequestException as e:
+        _notify["error"](f"데이터랩 API 연동 중 오류: {e}")
+        return None
+
+# ----------------------------------------------------------------------
+# 1. AI 분석 모듈
+# ----------------------------------------------------------------------
+
+class MonthlySeries:
+    """
+    데이터랩 월간 시계열 (12개 남짓). 점수 계산은 가벼운 배열로 하고,
+    차트가 필요할 때만 to_frame() 에서 pandas 를 불러와 기존과 같은 DataFrame(period 인덱스, ratio 열)을 만듭니다.
+    """
+
+    def __init__(self, points):
+        self.periods = tuple(point['period'] for point in points)
+        self.ratios = array('d', (float(point['ratio']) for point in points))
+
+    def __len__(self):
+        return len(self.ratios)
+
+    @property
+    def empty(self):
+        return not self.ratios
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame({"ratio": list(self.ratios)}, index=pd.DatetimeIndex(pd.to_datetime(list(self.periods)), name="period"))
+
+
+def datalab_monthly_series(api_url, headers, body, group_field, keyword, category=""):
+    """
+    최근 1년 월간 시계열. 로컬 저장소에 있는 달은 다시 받지 않고, 빠진 최근 구간만 요청합니다.
+    body 에는 기간(startDate/endDate/timeUnit)을 뺀 나머지 요청 내용을 넘깁니다.
+    """
+    def fetch(start_date, end_date):
+        request_body = dict(body, startDate=start_date.strftime("%Y-%m-%d"), endDate=end_date.strftime("%Y-%m-%d"), timeUnit="month")
+        data = call_datalab_api(api_url, headers, request_body, group_field=group_field)
+        if data is None:
+            return None  # 요청 실패 (빈 목록은 '데이터 없음'으로 저장됨)
+        results = data.get('results') or [{}]
+        return results[0].get('data') or []
+    endpoint = api_url.split("/v1/", 1)[-1]
+    with span(f"fetch:{endpoint}"):
+        return monthly_series(fetch, endpoint, keyword, category)
+
+def analyze_search_trend(product_name, headers):
+    api_url = f"{NAVER_API_BASE}/v1/datalab/search"
+    body = {"keywordGroups": [{"groupName": product_name, "keywords": [product_name]}]}
+    trend_data = datalab_monthly_series(api_url, headers, body, "keywordGroups", product_name)
+    if trend_data is not None:
+        if not trend_data: return 1, "검색어 트렌드 데이터가 없습니다.", MonthlySeries([])
+        with span("series:trend"):
+            series = MonthlySeries(trend_data)
+        ratios = series.ratios
+        recent_avg = sum(ratios[-3:]) / len(ratios[-3:]); past_avg = sum(ratios[-6:-3]) / len(ratios[-6:-3]) if len(ratios) > 3 else recent_avg
+        trend_score = 5
+        if recent_avg > past_avg * 1.2: trend_status = "상승세"; trend_score += 3
+        elif recent_avg < past_avg * 0.8: trend_status = "하락세"; trend_score -= 2
+        else: trend_status = "보합세"
+        return min(10, max(1, trend_score)), f"관심도는 현재 **'{trend_status}'** 입니다.", series
+    return 1, "검색어 트렌드 데이터를 가져오지 못했습니다.", None
+
+def analyze_shopping_insight(product_name, headers, category_id="50000006"):
+    api_url = f"{NAVER_API_BASE}/v1/datalab/shopping/category/keywords"
+    body = {"category": category_id, "keyword": [{"name": product_name, "param": [product_name]}]}
+    insight_data = datalab_monthly_series(api_url, headers, body, "keyword", product_name, category_id)
+    if insight_data is not None:
+        if not insight_data: return 1, "쇼핑 인사이트 데이터가 없습니다.", MonthlySeries([])
+        with span("series:insight"):
+            series = MonthlySeries(insight_data)
+        market_size_score = min(10, max(1, math.log(sum(series.ratios) + 1) * 2))
+        return market_size_score, f"시장 관심도는 **{'높음' if market_size_score > 6 else '보통' if market_size_score > 3 else '낮음'}**으로 판단됩니다.", series
+    return 1, "쇼핑 인사이트 데이터를 가져오지 못했습니다.", None
+
+# [개선] 분석 함수가 근거자료(raw data)까지 반환하도록 수정
+# 분석 함수들은 API 실패 시에도 기본 점수를 돌려주며, 실패와 '데이터 없음'은 세 번째(또는 쇼핑/뉴스) 값으로 구분합니다.
+#   시계열: 실패 None / 데이터 없음 빈 MonthlySeries,  검색 결과: 실패 None / 0건 []
+def analyze_competition_and_rarity(product_name, headers):
+    shop_results = search_naver(f'"{product_name}"', headers, endpoint="shop")
+    raw_materials = ['문어', '고추냉이', '소라'] if any(k in product_name for k in ['타코', '소라']) else [product_name.replace('와사비', '')]
+    news_results = search_naver(f"{' '.join(raw_materials)} 가격 급등 수급 불안", headers, endpoint="news")
+    # 판매처만 다른 같은 상품과 자사 상품은 빼고, 서로 다른 경쟁 상품 수로 셉니다.
+    competitor_count = competitor_summary(shop_results or [])["competitors"]; rarity_count = len(news_results or [])
+    comp_score = min(10, competitor_count); rarity_score = min(10, 1 + rarity_count * 2)
+    if shop_results is None:
+        comp_text = "네이버 쇼핑 검색 결과를 가져오지 못했습니다."
+    else:
+        comp_text = f"네이버 쇼핑에서 **{competitor_count}개 이상**의 경쟁 상품이 검색되었습니다. (같은 상품·자사 상품 제외)"
+    if news_results is None:
+        rarity_text = "주요 원재료 관련 뉴스를 가져오지 못했습니다."
+    else:
+        rarity_text = f"주요 원재료 관련 가격/수급 뉴스가 **{rarity_count}건** 검색되었습니다."
+    return comp_score, rarity_score, comp_text, rarity_text, shop_results, news_results
+
+def suggest_margin(scores, base_cost, competitor_median=None):
+    """
+    competitor_median 이 있으면 제안가가 경쟁 중앙값의 130%를 넘지 않도록 120% 수준으로 맞춥니다.
+    다만 최소 마진(15%) 가격 아래로는 내리지 않습니다. (경쟁가가 원가보다 낮아도 원가 이하 판매가를 제안하지 않음)
+    """
+    trend_score = scores.get('trend', 5); market_size_score = scores.get('market_size', 5); competition_score = scores.get('competition', 5); rarity_score = scores.get('rarity', 5)
+    base_margin = 35.0
+    suggested_margin = base_margin + (trend_score - 5) * 1.5 + (market_size_score - 5) * 1.0 + (rarity_score - 5) * 1.0 - (competition_score - 5) * 1.5
+    suggested_margin = max(15.0, min(70.0, suggested_margin))
+    suggested_price = int(base_cost / (1 - (suggested_margin / 100)))
+    floor_price = base_cost / (1 - 15.0 / 100)
+    if competitor_median and suggested_price > competitor_median * 1.3:
+        suggested_price = max(int(competitor_median * 1.2), math.ceil(floor_price))
+    final_price = round(suggested_price / 100) * 100
+    if final_price < floor_price: final_price = math.ceil(floor_price / 100) * 100
+    final_margin = (1 - (base_cost / final_price)) * 100 if final_price > 0 else 0
+    return final_margin, final_price
+
+def simulate_margin(scores, base_cost, competitor_median=None, trend_series=None, shopping_series=None, price_stats=None,
+                    samples=DEFAULT_SAMPLES, seed=None):
+    """
+    suggest_margin 의 불확실성 구간 (P10/P50/P90 마진율과 판매가). margin_simulation 참고.
+    trend_series/shopping_series: 데이터랩 MonthlySeries (달 복원추출), price_stats: 중앙값 분포용 p25/p75/건수
+    (competitor_price_stats 결과 또는 shop_crawl 요약). 없는 근거는 scores 의 점 추정값을 그대로 씁니다.
+    """
+    import numpy as np
+    rng = make_rng(seed)
+    trend = scores.get('trend', 5); market_size = scores.get('market_size', 5)
+    if trend_series is not None and not trend_series.empty: trend = bootstrap_trend_scores(trend_series.ratios, samples, rng)
+    if shopping_series is not None and not shopping_series.empty: market_size = bootstrap_market_size_scores(shopping_series.ratios, samples, rng)
+    # 경쟁 점수 = min(10, 경쟁 상품 수), 희소성 점수 = min(10, 1 + 뉴스 건수 * 2) 에서 건수를 되돌려 다시 뽑음
+    # 둘 다 display=10 검색에서 나온 건수라 점수 상한(경쟁 10개, 뉴스 4.5건 이상)에 닿은 값은 하한으로만 취급
+    competition = np.minimum(10, sample_counts(scores.get('competition', 5), samples, rng, cap=10))
+    rarity = np.minimum(10, 1 + 2 * sample_counts((scores.get('rarity', 5) - 1) / 2, samples, rng, cap=4.5))
+    stats = price_stats or {}
+    median = sample_median(competitor_median, stats.get('p25'), stats.get('p75'),
+                           stats.get('count') or stats.get('priced_items') or 0, samples, rng)
+    return summarize(*naver_margin_samples(trend, market_size, competition, rarity, base_cost, median))
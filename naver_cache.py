@@ -0,0 +1,192 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# ----------------------------------------------------------------------
+# 네이버 API 응답 디스크 캐시 (SQLite)
+# 키: 엔드포인트 + 정규화된 쿼리/바디(기간 포함). 인증 헤더는 키에 넣지 않습니다.
+# 엔드포인트 종류별 TTL, 최대 건수 초과 시 오래 안 쓴 항목부터 삭제, 적중/미적중 집계.
+# keep_warm(ttl) 블록에서 받은 응답은 항목별로 더 긴 TTL 을 가집니다. (prefetch.py 가 다음 실행까지 유지)
+# ----------------------------------------------------------------------
+
+DEFAULT_CACHE_PATH = os.environ.get("GOREMI_CACHE_PATH", os.path.join(".cache", "naver_api.sqlite3"))
+DEFAULT_MAX_ENTRIES = 5000
+
+# 엔드포인트 종류별 TTL(초). 데이터랩 월간 시계열은 하루 안에 거의 바뀌지 않습니다.
+# GPT 가격 제안(gpt_pricing.py)은 실시간 데이터가 아니므로 더 오래 보관합니다. (별도 파일의 전용 캐시 사용)
+DEFAULT_TTLS = {
+    "search": 60 * 60,
+    "datalab": 24 * 60 * 60,
+    "gpt": 7 * 24 * 60 * 60,
+}
+
+
+_warm_ttl: contextvars.ContextVar = contextvars.ContextVar("cache_warm_ttl", default=None)
+
+
+@contextmanager
+def keep_warm(ttl: float) -> Iterator[None]:
+    """
+    블록 안(과 copy_context 로 넘긴 작업 스레드)의 조회는 앞으로 ttl 초 이상 유효한 항목만 적중으로 보고,
+    새로 받은 응답은 max(ttl, 종류별 TTL) 동안 보관합니다.
+    """
+    token = _warm_ttl.set(ttl)
+    try:
+        yield
+    finally:
+        _warm_ttl.reset(token)
+
+
+def warm_ttl() -> Optional[float]:
+    return _warm_ttl.get()
+
+
+def endpoint_kind(url: str) -> str:
+    """URL 로부터 TTL 구분용 엔드포인트 종류를 판별합니다."""
+    return "datalab" if "/datalab/" in url else "search"
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(url: str, payload: Optional[Dict[str, Any]]) -> str:
+    """엔드포인트 + 정규화된 쿼리/바디로 캐시 키를 만듭니다. (데이터랩 바디의 startDate/endDate 가 기간 역할)"""
+    path = url.split("://", 1)[-1].split("/", 1)[-1]  # 호스트를 빼서 스텁/실서버가 같은 키를 쓰도록
+    raw = json.dumps([path, _normalize(payload or {})], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttls: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL, ttl REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "ttl" not in columns:  # 항목별 TTL 이전에 만든 캐시 파일
+            self._conn.execute("ALTER TABLE responses ADD COLUMN ttl REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+
+    def ttl_for(self, kind: str) -> float:
+        return self.ttls.get(kind, DEFAULT_TTLS["search"])
+
+    def get(self, kind: str, key: str, allow_stale: bool = False, min_fresh: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        allow_stale 이면 TTL 이 지났어도 (아직 지워지지 않은) 저장된 응답을 돌려줍니다.
+        min_fresh 초 안에 만료되는 항목은 없는 것으로 봅니다.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at, ttl FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (not allow_stale and now + min_fresh - row[1] > (row[2] or self.ttl_for(kind))):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, kind: str, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """ttl 을 주면 종류별 TTL 대신 이 항목에만 적용합니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, value, created_at, accessed_at, ttl) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(value, ensure_ascii=False, separators=(",", ":")), now, now, ttl),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # 만료 항목부터 지우고, 그래도 넘치면 가장 오래 안 쓴 항목부터 삭제
+        now = time.time()
+        for kind, ttl in self.ttls.items():
+            self._conn.execute("DELETE FROM responses WHERE kind = ? AND created_at + COALESCE(ttl, ?) < ?", (kind, ttl, now))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = self.misses = 0
+
+
+def cached_call(url: str, payload: Optional[Dict[str, Any]],
+                fetch: Callable[[], Tuple[int, Optional[Dict[str, Any]]]],
+                cache: Optional[ResponseCache] = None) -> Tuple[int, Optional[Dict[str, Any]], bool]:
+    """
+    캐시에 있으면 (200, data, True), 없으면 fetch() 로 (status, data) 를 받아 200 일 때만 저장 후 (status, data, False).
+    할당량 부족(QuotaExhausted)으로 보내지 못하면 만료된 캐시라도 (200, data, True) 로 돌려주고, 그것도 없으면 다시 던집니다.
+    """
+    from naver_scheduler import QuotaExhausted, note_denied
+
+    cache = cache or get_cache()
+    kind = endpoint_kind(url)
+    key = make_key(url, payload)
+    warm = warm_ttl()
+    data = cache.get(kind, key, min_fresh=warm or 0.0)
+    if data is not None:
+        return 200, data, True
+    try:
+        status, data = fetch()
+    except QuotaExhausted as e:
+        data = cache.get(kind, key, allow_stale=True)
+        if data is not None:
+            return 200, data, True
+        note_denied(e)
+        raise
+    if status == 200 and data is not None:
+        cache.set(kind, key, data, ttl=max(warm, cache.ttl_for(kind)) if warm else None)
+        if "/v1/search/shop" in url:
+            # 새로 받은 쇼핑 검색 결과는 경쟁 상품 가격 이력에도 쌓음 (캐시 적중은 같은 관측이므로 제외)
+            from price_history import record_shop_response
+            record_shop_response(payload, data)
+    return status, data, False
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """프로세스 공용 캐시 인스턴스."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
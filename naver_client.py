@@ -0,0 +1,105 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import api_cassette
+from naver_scheduler import PriorityGate, QuotaScheduler, get_scheduler
+
+# ----------------------------------------------------------------------
+# 공용 네이버 HTTP 클라이언트
+# 세션 재사용(keep-alive 커넥션 풀), 타임아웃, 429/5xx 지수 백오프(지터) 재시도,
+# 동시 진행 요청 수 상한(우선순위 순), 일일 할당량(naver_scheduler)을 한 곳에서 처리합니다.
+# ----------------------------------------------------------------------
+
+# 로컬 스텁 서버 등으로 돌리고 싶을 때 NAVER_API_BASE 환경변수로 교체
+NAVER_API_BASE = os.environ.get("NAVER_API_BASE", "https://openapi.naver.com").rstrip("/")
+
+# (연결, 읽기) 타임아웃 초
+DEFAULT_TIMEOUT = (3.05, float(os.environ.get("GOREMI_HTTP_TIMEOUT", "10")))
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("GOREMI_HTTP_MAX_IN_FLIGHT", "8"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class NaverClient:
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = 0.5, backoff_cap: float = 8.0,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, pool_size: int = 16,
+                 scheduler: Optional[QuotaScheduler] = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._in_flight = PriorityGate(max_in_flight)
+        self.scheduler = scheduler  # None 이면 프로세스 공용 스케줄러
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        # 서버가 Retry-After 를 주면 우선 따르고, 아니면 full jitter 지수 백오프
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                params: Optional[Dict[str, Any]] = None, json_body: Optional[Dict[str, Any]] = None,
+                data: Optional[bytes] = None, timeout: Optional[Timeout] = None,
+                cassette: Optional[api_cassette.Cassette] = None) -> requests.Response:
+        """
+        요청을 보내고 최종 응답을 반환합니다. 429/5xx 와 연결 오류는 max_retries 까지 재시도하고,
+        재시도 후에도 실패하면 마지막 응답을 그대로 돌려주거나(상태코드) 마지막 예외를 다시 던집니다.
+        실제로 보내는 시도마다 할당량 토큰을 하나씩 쓰고, 받지 못하면 QuotaExhausted 를 던집니다. (재시도하지 않음)
+        녹화/재생 모드(api_cassette)에서는 재시도를 마친 최종 응답을 녹화하고, 재생 시에는 네트워크를 쓰지 않습니다.
+        cassette 를 주면 프로세스 공용 카세트 대신 사용합니다.
+        """
+        def live():
+            return self._send(method, url, headers, params, json_body, data, timeout)
+        return api_cassette.send(method, url, live, params=params, json_body=json_body, data=data, cassette=cassette)
+
+    def _send(self, method: str, url: str, headers: Optional[Dict[str, str]], params: Optional[Dict[str, Any]],
+              json_body: Optional[Dict[str, Any]], data: Optional[bytes], timeout: Optional[Timeout]) -> requests.Response:
+        attempt = 0
+        while True:
+            response = None
+            try:
+                (self.scheduler or get_scheduler()).take(url)
+                with self._in_flight.slot():
+                    response = self.session.request(method, url, headers=headers, params=params, json=json_body,
+                                                    data=data, timeout=timeout or self.timeout)
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> NaverClient:
+    """프로세스 공용 클라이언트 (커넥션 풀을 모든 호출이 공유)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = NaverClient()
+        return _default_client
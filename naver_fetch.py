@@ -0,0 +1,186 @@
+import contextvars
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from datalab_batcher import datalab_request
+from naver_cache import cached_call
+from naver_client import NAVER_API_BASE, RETRY_STATUS, get_client
+from naver_scheduler import QuotaExhausted
+from stage_timing import record
+
+# ----------------------------------------------------------------------
+# 네이버 API 동시 호출 모듈
+# 여러 엔드포인트를 한 번에 보내고, 가장 느린 호출 하나만큼만 기다립니다.
+# ----------------------------------------------------------------------
+
+SEARCH_API_URL = f"{NAVER_API_BASE}/v1/search/shop.json"
+TREND_API_URL = f"{NAVER_API_BASE}/v1/datalab/search"
+SHOPPING_INSIGHT_URL = f"{NAVER_API_BASE}/v1/datalab/shopping/categories"
+BLOG_API_URL = f"{NAVER_API_BASE}/v1/search/blog.json"
+CAFE_API_URL = f"{NAVER_API_BASE}/v1/search/cafearticle.json"
+
+DEFAULT_TIMEOUT = 10.0
+SIGNAL_RETRIES = 2    # retry_failed: 클라이언트가 재시도하지 않은 실패만 다시 보내는 최대 횟수
+SIGNAL_BACKOFF = 0.5  # retry_failed: 첫 재시도 전 최대 대기(초), 이후 2배씩
+
+
+class FetchResult:
+    """
+    엔드포인트 한 건의 호출 결과 (상태코드, JSON 본문, 오류, 소요시간).
+    retryable: 다시 보내면 나아질 수 있는 실패인지 (연결 오류/타임아웃/429/5xx). 할당량 부족이나 4xx 는 아님.
+    fetch_one 은 NaverClient 가 이미 재시도한 실패(429/5xx, 연결 오류/타임아웃)는 retryable=False 로 돌려줍니다.
+    """
+
+    __slots__ = ("name", "status_code", "data", "error", "elapsed", "retryable")
+
+    def __init__(self, name: str, status_code: int = 0, data: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0, retryable: Optional[bool] = None):
+        self.name = name
+        self.status_code = status_code
+        self.data = data
+        self.error = error
+        self.elapsed = elapsed
+        self.retryable = (status_code == 0 or status_code in RETRY_STATUS) if retryable is None else retryable
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200 and self.data is not None
+
+    def __repr__(self) -> str:
+        return f"FetchResult({self.name!r}, status={self.status_code}, error={self.error!r}, elapsed={self.elapsed:.3f})"
+
+
+def fetch_one(name: str, method: str, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+              json_body: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT,
+              use_cache: bool = True, group_field: Optional[str] = None) -> FetchResult:
+    """
+    단일 요청. 예외를 밖으로 던지지 않고 FetchResult에 담아 반환합니다.
+    group_field 가 있으면 데이터랩 배처를 통해 다른 상품 요청과 묶어서 보냅니다.
+    """
+    started = time.perf_counter()
+    error = None
+    # 429/5xx 응답과 연결 오류/타임아웃은 클라이언트가 이미 max_retries 번 재시도한 결과
+    client_retried = get_client().max_retries > 0
+
+    def send():
+        nonlocal error
+        response = get_client().request(method, url, headers=headers, params=params, json_body=json_body, timeout=timeout)
+        if response.status_code != 200:
+            error = response.text[:200]
+            return response.status_code, None
+        return 200, response.json()
+
+    try:
+        if group_field and use_cache:
+            status_code, data = datalab_request(url, headers, json_body, group_field, timeout=timeout * 2)
+        elif use_cache:
+            status_code, data, _ = cached_call(url, json_body if json_body is not None else params, send)
+        else:
+            status_code, data = send()
+        if status_code != 200 and error is None:
+            error = f"HTTP {status_code}"
+        result = FetchResult(name, status_code, data, error, time.perf_counter() - started,
+                             retryable=False if client_retried else None)
+    except QuotaExhausted as e:
+        result = FetchResult(name, 0, None, str(e), time.perf_counter() - started, retryable=False)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        result = FetchResult(name, 0, None, str(e), time.perf_counter() - started,
+                             retryable=False if client_retried else None)
+    except (requests.exceptions.RequestException, ValueError, TimeoutError) as e:
+        result = FetchResult(name, 0, None, str(e), time.perf_counter() - started)
+    record(f"fetch:{name}", result.elapsed, result.ok)
+    return result
+
+
+def fetch_all(calls: List[Dict[str, Any]], max_workers: Optional[int] = None,
+              timeout: float = DEFAULT_TIMEOUT, use_cache: bool = True) -> Dict[str, FetchResult]:
+    """
+    calls: [{"name", "method", "url", "headers", "params"?, "json"?, "timeout"?, "group_field"?}, ...]
+    모든 요청을 스레드 풀로 동시에 보내고 name -> FetchResult 로 돌려줍니다.
+    호출별 timeout 이 없으면 공통 timeout 을 사용합니다.
+    """
+    if not calls:
+        return {}
+    workers = max_workers or len(calls)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # 작업 스레드에서도 호출한 쪽의 계측 실행(stage_timing.run)에 기록되도록 컨텍스트를 복사
+        futures = {
+            call["name"]: pool.submit(
+                contextvars.copy_context().run, fetch_one, call["name"], call["method"], call["url"], call["headers"],
+                call.get("params"), call.get("json"), call.get("timeout", timeout), use_cache,
+                call.get("group_field"),
+            )
+            for call in calls
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def retry_failed(calls: List[Dict[str, Any]], results: Dict[str, FetchResult], retries: int = SIGNAL_RETRIES,
+                 backoff: float = SIGNAL_BACKOFF, timeout: float = DEFAULT_TIMEOUT,
+                 use_cache: bool = True) -> Dict[str, int]:
+    """
+    fetch_all 결과 중 retryable 한 실패만 골라 지수 백오프(지터) 뒤 다시 보냅니다. 성공한 결과는 다시 보내지 않습니다.
+    클라이언트가 이미 재시도한 실패는 제외하므로 (엔드포인트당 전송·할당량 토큰이 곱절로 늘지 않음),
+    다시 보내는 것은 배처 대기 시간 초과, 잘린 응답 본문 같은 클라이언트 밖의 실패뿐입니다.
+    results 를 제자리에서 갱신하고, 엔드포인트별 총 시도 횟수를 돌려줍니다.
+    """
+    calls_by_name = {call["name"]: call for call in calls}
+    attempts = {name: 1 for name in results}
+    for attempt in range(retries):
+        failed = [calls_by_name[name] for name, result in results.items()
+                  if not result.ok and result.retryable and name in calls_by_name]
+        if not failed:
+            break
+        time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+        results.update(fetch_all(failed, timeout=timeout, use_cache=use_cache))
+        for call in failed:
+            attempts[call["name"]] += 1
+    return attempts
+
+
+def fetch_sequential(calls: List[Dict[str, Any]], timeout: float = DEFAULT_TIMEOUT,
+                     use_cache: bool = True) -> Dict[str, FetchResult]:
+    """기존 방식(순차 호출). 벤치마크 비교용."""
+    return {
+        call["name"]: fetch_one(call["name"], call["method"], call["url"], call["headers"],
+                                call.get("params"), call.get("json"), call.get("timeout", timeout), use_cache)
+        for call in calls
+    }
+
+
+def build_competitiveness_calls(product_name: str, headers: Dict[str, str], category_id: str, start_date: str, end_date: str) -> List[Dict]:
+    """
+    analyze_product_competitiveness 가 사용하는 5개 엔드포인트 요청 명세.
+    응답 병합 순서(shop -> trend -> insight -> blog -> cafe)는 호출하는 쪽에서 고정합니다.
+    """
+    return [
+        {"name": "shop", "method": "GET", "url": SEARCH_API_URL, "headers": headers,
+         "params": {"query": product_name, "display": 100}},
+        {"name": "trend", "method": "POST", "url": TREND_API_URL, "headers": headers,
+         "group_field": "keywordGroups",
+         "json": {
+             "startDate": start_date,
+             "endDate": end_date,
+             "timeUnit": "month",
+             "keywordGroups": [{"groupName": product_name, "keywords": [product_name]}]
+         }},
+        {"name": "insight", "method": "POST", "url": SHOPPING_INSIGHT_URL, "headers": headers,
+         "group_field": "category" if category_id else None,
+         "json": {
+             "startDate": start_date,
+             "endDate": end_date,
+             "timeUnit": "month",
+             "category": [{"name": product_name, "param": [category_id]}] if category_id else [],
+             "device": "",
+             "ages": [],
+             "gender": ""
+         }},
+        {"name": "blog", "method": "GET", "url": BLOG_API_URL, "headers": headers,
+         "params": {"query": product_name, "display": 100}},
+        {"name": "cafe", "method": "GET", "url": CAFE_API_URL, "headers": headers,
+         "params": {"query": product_name, "display": 100}},
+    ]
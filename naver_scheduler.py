@@ -0,0 +1,276 @@
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+# ----------------------------------------------------------------------
+# 네이버 API 일일 할당량 스케줄러
+# 엔드포인트 묶음(검색 / 데이터랩 검색어 트렌드 / 데이터랩 쇼핑 인사이트)마다 토큰 버킷을 두고,
+# 모든 네이버 호출(NaverClient)이 실제로 보내기 직전에 토큰을 하나씩 가져갑니다.
+# 버킷 상태는 SQLite 에 있어 Streamlit 앱, 배치, 가격 서비스 등 여러 프로세스가 같은 할당량을 나눠 씁니다.
+#
+# 우선순위: interactive(화면 조회, 기본값) > batch(일괄 분석) > prefetch(미리 받아두기).
+#   with priority(BATCH): ...   # 이 블록(과 copy_context 로 넘긴 작업 스레드)의 호출은 batch 로 처리
+# - 낮은 우선순위는 버킷에 RESERVES 비율 이상이 남아 있을 때만 토큰을 받습니다. 모자라면 QuotaExhausted 를 던지고
+#   캐시 계층(naver_cache.cached_call, datalab_request)이 만료된 캐시라도 돌려줘 캐시 전용으로 동작합니다.
+# - interactive 는 예약분까지 쓸 수 있고, 토큰이 곧 채워지면(MAX_INTERACTIVE_WAIT 이내) 기다렸다가 보냅니다.
+# - 동시에 보낼 수 있는 요청 수(NaverClient max_in_flight)도 PriorityGate 로 우선순위 순서대로 배정합니다.
+#   python naver_scheduler.py        # 남은 할당량과 오늘 사용/거절 건수
+# GOREMI_QUOTA_PATH="" 이면 할당량을 세지 않습니다. (로컬 스텁 벤치마크 등)
+# ----------------------------------------------------------------------
+
+DEFAULT_QUOTA_PATH = os.environ.get("GOREMI_QUOTA_PATH", os.path.join(".cache", "naver_quota.sqlite3"))
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PREFETCH = "prefetch"
+PRIORITY_ORDER = {INTERACTIVE: 0, BATCH: 1, PREFETCH: 2}
+# 우선순위별로 남겨둬야 하는 버킷 비율. batch 는 30%, prefetch 는 50% 아래로는 쓰지 않음
+RESERVES = {INTERACTIVE: 0.0, BATCH: 0.3, PREFETCH: 0.5}
+MAX_INTERACTIVE_WAIT = 5.0  # 화면 조회가 토큰을 기다리는 최대 시간(초)
+
+# 묶음 -> (일일 할당량, 버킷 크기). 하루(24시간) 동안 쓸 수 있는 양이 할당량을 넘지 않도록
+# (할당량 - 버킷 크기) 를 하루에 걸쳐 고르게 채웁니다. 버킷 크기만큼은 한꺼번에 쓸 수 있습니다.
+DEFAULT_BUDGETS = {
+    "search": (25000, 2500),
+    "datalab_search": (1000, 200),
+    "datalab_shopping": (1000, 200),
+}
+DAY = 24 * 60 * 60
+
+
+def endpoint_family(url: str) -> Optional[str]:
+    """URL 의 할당량 묶음. 네이버 오픈 API 가 아니면(예: Google 검색) None."""
+    path = url.split("?", 1)[0]
+    if "/v1/datalab/shopping/" in path:
+        return "datalab_shopping"
+    if "/v1/datalab/" in path:
+        return "datalab_search"
+    if "/v1/search/" in path:
+        return "search"
+    return None
+
+
+class QuotaExhausted(requests.exceptions.RequestException):
+    """할당량 부족으로 보내지 않은 요청. 호출하는 쪽에는 다른 요청 오류와 같이 보입니다."""
+
+    def __init__(self, family: str, priority: str, remaining: float):
+        super().__init__(f"네이버 {family} 할당량 부족 ({priority}, 남은 {remaining:.0f}회)")
+        self.family = family
+        self.priority = priority
+        self.remaining = remaining
+
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("naver_priority", default=INTERACTIVE)
+_current_denials: contextvars.ContextVar = contextvars.ContextVar("naver_denials", default=None)
+
+
+@contextmanager
+def priority(level: str) -> Iterator[None]:
+    if level not in PRIORITY_ORDER:
+        raise ValueError(f"알 수 없는 우선순위: {level}")
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@contextmanager
+def track_denials() -> Iterator[List[QuotaExhausted]]:
+    """
+    블록 안에서 할당량 때문에 캐시로도 대신하지 못한 요청을 모읍니다.
+    배치에서 이 목록이 비어 있지 않으면 결과를 기록하지 않고 다음 실행에 다시 시도하게 할 수 있습니다.
+    """
+    denials: List[QuotaExhausted] = []
+    token = _current_denials.set(denials)
+    try:
+        yield denials
+    finally:
+        _current_denials.reset(token)
+
+
+def note_denied(error: QuotaExhausted) -> None:
+    denials = _current_denials.get()
+    if denials is not None:
+        denials.append(error)
+
+
+class PriorityGate:
+    """동시 진행 수 상한. 빈 자리가 나면 기다리는 요청 중 우선순위가 가장 높은(먼저 온) 요청부터 보냅니다."""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    @contextmanager
+    def slot(self, level: Optional[str] = None) -> Iterator[None]:
+        ticket = (PRIORITY_ORDER[level or current_priority()], next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while self._free == 0 or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._free -= 1
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._free += 1
+                self._cond.notify_all()
+
+
+class QuotaScheduler:
+    def __init__(self, path: Optional[str] = DEFAULT_QUOTA_PATH,
+                 budgets: Optional[Dict[str, Tuple[int, int]]] = None,
+                 max_interactive_wait: float = MAX_INTERACTIVE_WAIT):
+        self.path = path
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.max_interactive_wait = max_interactive_wait
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            if path != ":memory:" and os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (family TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage (day TEXT NOT NULL, family TEXT NOT NULL, priority TEXT NOT NULL,"
+                " granted INTEGER NOT NULL DEFAULT 0, denied INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (day, family, priority))"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def _rate(self, family: str) -> float:
+        quota, burst = self.budgets[family]
+        return max(quota - burst, 0) / DAY
+
+    def _refilled(self, family: str, now: float) -> float:
+        """현재 토큰 수 (트랜잭션 안에서 호출)."""
+        _, burst = self.budgets[family]
+        row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE family = ?", (family,)).fetchone()
+        if row is None:
+            return float(burst)
+        return min(float(burst), row[0] + max(0.0, now - row[1]) * self._rate(family))
+
+    def _try_take(self, family: str, level: str) -> Tuple[bool, float, float]:
+        """(받았는지, 남은 토큰, 받을 수 있을 때까지 기다려야 하는 초)."""
+        _, burst = self.budgets[family]
+        reserve = burst * RESERVES[level]
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens = self._refilled(family, now)
+                granted = tokens - 1 >= reserve
+                if granted:
+                    tokens -= 1
+                self._conn.execute("INSERT OR REPLACE INTO buckets (family, tokens, updated_at) VALUES (?, ?, ?)",
+                                   (family, tokens, now))
+                self._conn.execute(
+                    "INSERT INTO usage (day, family, priority, granted, denied) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(day, family, priority) DO UPDATE SET"
+                    " granted = granted + excluded.granted, denied = denied + excluded.denied",
+                    (date.today().isoformat(), family, level, int(granted), int(not granted)),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        rate = self._rate(family)
+        wait = 0.0 if granted else ((reserve + 1 - tokens) / rate if rate > 0 else float("inf"))
+        return granted, tokens, wait
+
+    def take(self, url: str, level: Optional[str] = None) -> None:
+        """
+        url 이 속한 묶음에서 토큰 하나를 가져옵니다. 네이버 API 가 아니거나 스케줄러가 꺼져 있으면 아무것도 하지 않습니다.
+        받지 못하면 QuotaExhausted. (interactive 는 max_interactive_wait 안에 채워질 때만 기다림)
+        """
+        family = endpoint_family(url)
+        if not self.enabled or family not in self.budgets:
+            return
+        level = level or current_priority()
+        while True:
+            granted, remaining, wait = self._try_take(family, level)
+            if granted:
+                return
+            if level != INTERACTIVE or wait > self.max_interactive_wait:
+                raise QuotaExhausted(family, level, remaining)
+            time.sleep(wait)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """묶음별 남은 토큰/버킷 크기/일일 할당량과 오늘 우선순위별 사용·거절 건수."""
+        if not self.enabled:
+            return {}
+        now = time.time()
+        today = date.today().isoformat()
+        with self._lock:
+            remaining = {family: self._refilled(family, now) for family in self.budgets}
+            rows = self._conn.execute("SELECT family, priority, granted, denied FROM usage WHERE day = ?",
+                                      (today,)).fetchall()
+        snapshot = {}
+        for family, (quota, burst) in self.budgets.items():
+            snapshot[family] = {"remaining": int(remaining[family]), "burst": burst, "daily_quota": quota,
+                                "used_today": 0, "denied_today": 0}
+        for family, level, granted, denied in rows:
+            if family in snapshot:
+                snapshot[family]["used_today"] += granted
+                snapshot[family]["denied_today"] += denied
+                snapshot[family][f"used_{level}"] = granted
+        return snapshot
+
+
+def render_panel(st, scheduler: Optional[QuotaScheduler] = None) -> None:
+    """Streamlit 사이드바용 남은 할당량 표시. st 모듈을 인자로 받아 이 모듈은 Streamlit 없이도 import 됩니다."""
+    snapshot = (scheduler or get_scheduler()).snapshot()
+    for family, s in snapshot.items():
+        st.caption(f"할당량 {family}: 남은 {s['remaining']:,}/{s['burst']:,} · 오늘 {s['used_today']:,}회"
+                   + (f" (거절 {s['denied_today']:,})" if s["denied_today"] else ""))
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> QuotaScheduler:
+    """프로세스 공용 스케줄러 (버킷 상태는 GOREMI_QUOTA_PATH 를 쓰는 모든 프로세스가 공유)."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = QuotaScheduler()
+        return _default_scheduler
+
+
+def main(argv) -> int:
+    scheduler = QuotaScheduler(argv[1] if len(argv) > 1 else DEFAULT_QUOTA_PATH)
+    print(f"{'family':<20}{'remaining':>12}{'burst':>10}{'quota/day':>12}{'used':>10}{'denied':>10}")
+    for family, s in scheduler.snapshot().items():
+        print(f"{family:<20}{s['remaining']:>12,}{s['burst']:>10,}{s['daily_quota']:>12,}"
+              f"{s['used_today']:>10,}{s['denied_today']:>10,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
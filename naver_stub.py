@@ -0,0 +1,217 @@
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ----------------------------------------------------------------------
+# 로컬 네이버 API 스텁 서버 (벤치마크/오프라인 확인용)
+# 실제 API 와 같은 경로로 고정 응답을 돌려주며, 응답 지연과 오류(429/500) 비율을 설정할 수 있습니다.
+# fixtures 디렉터리를 주면 저장해 둔 실제 응답(shop.json, blog.json, cafearticle.json, news.json,
+# datalab_search.json, datalab_shopping.json)을 우선 돌려주고, 없는 종류는 합성 응답을 만듭니다.
+# OpenAI 호환 /v1/chat/completions 도 흉내 내므로 OPENAI_BASE_URL={base_url}/v1 로 GPT 경로도 확인할 수 있습니다.
+# ----------------------------------------------------------------------
+
+MONTHS = [f"2024-{m:02d}-01" for m in range(1, 13)]
+
+
+def _months_between(start_date, end_date):
+    """요청 구간의 월 시작일 목록 (구간 정보가 없으면 2024년 12개월)."""
+    if not start_date or not end_date:
+        return MONTHS
+    year, month = int(start_date[:4]), int(start_date[5:7])
+    months = []
+    while f"{year:04d}-{month:02d}" <= end_date[:7]:
+        months.append(f"{year:04d}-{month:02d}-01")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _search_payload(query, display, start=1):
+    items = [
+        {"title": f"<b>{query}</b> 상품 {i}", "link": f"https://example.com/{i}", "description": f"{query} 설명 {i}",
+         "lprice": str(5000 + (i % 100) * 100), "hprice": "", "mallName": f"몰{i % 7}", "productId": str(100000 + i)}
+        for i in range(start - 1, start - 1 + display)
+    ]
+    return {"total": 1234, "display": display, "items": items}
+
+
+def _datalab_payload(body):
+    groups = body.get("keywordGroups") or body.get("keyword") or body.get("category") or [{}]
+    months = _months_between(body.get("startDate"), body.get("endDate"))
+    return {
+        "startDate": body.get("startDate"), "endDate": body.get("endDate"), "timeUnit": body.get("timeUnit"),
+        "results": [
+            {"title": g.get("groupName") or g.get("name"), "data": [{"period": p, "ratio": 40.0 + i * 5} for i, p in enumerate(months)]}
+            for g in groups
+        ],
+    }
+
+
+def _chat_payload(body):
+    prompt = body.get("messages", [{}])[-1].get("content", "")
+    product = prompt.split("상품명:", 1)[-1].strip().splitlines()[0] if "상품명:" in prompt else ""
+    price = 10000 + sum(map(ord, product)) % 90 * 100
+    content = json.dumps({
+        "competition": "중간", "margin_structure": "중",
+        "b2c_min": price, "b2c_max": price * 13 // 10,
+        "b2b_min": price * 6 // 10, "b2b_max": price * 8 // 10,
+        "note": f"{product} 스텁 응답",
+    }, ensure_ascii=False)
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": body.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt), "completion_tokens": len(content), "total_tokens": len(prompt) + len(content)},
+    }
+
+
+def _chat_stream_chunks(payload, chunk_size=4):
+    """chat.completion 응답을 stream=True 형식(chat.completion.chunk) 조각들로 나눕니다."""
+    content = payload["choices"][0]["message"]["content"]
+    base = {"id": payload["id"], "object": "chat.completion.chunk", "created": payload["created"], "model": payload["model"]}
+    yield dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+    for i in range(0, len(content), chunk_size):
+        yield dict(base, choices=[{"index": 0, "delta": {"content": content[i:i + chunk_size]}, "finish_reason": None}])
+    yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+
+
+def fixture_kind(path):
+    """요청 경로 -> fixture 이름. 예) /v1/search/shop.json -> shop, /v1/datalab/shopping/categories -> datalab_shopping"""
+    if path.startswith("/v1/search/"):
+        return path[len("/v1/search/"):].split(".", 1)[0]
+    if path.startswith("/v1/datalab/shopping/"):
+        return "datalab_shopping"
+    if path.startswith("/v1/datalab/"):
+        return "datalab_search"
+    return None
+
+
+def load_fixtures(directory):
+    """디렉터리의 <종류>.json 파일들을 {종류: 응답} 으로 읽습니다."""
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                fixtures[name[:-len(".json")]] = json.load(f)
+    return fixtures
+
+
+def _fixture_datalab_payload(fixture, body):
+    # 저장된 응답의 첫 그룹 시계열을 요청한 그룹 수만큼 복제 (묶음 요청도 같은 모양으로 응답)
+    groups = body.get("keywordGroups") or body.get("keyword") or body.get("category") or [{}]
+    template = (fixture.get("results") or [{"data": []}])[0]
+    return dict(fixture, startDate=body.get("startDate"), endDate=body.get("endDate"), results=[
+        dict(template, title=g.get("groupName") or g.get("name")) for g in groups
+    ])
+
+
+class NaverStubHandler(BaseHTTPRequestHandler):
+    latency = 0.0  # 초 단위 인위적 지연
+    token_latency = 0.0  # 스트리밍 응답의 조각 사이 지연(초)
+    error_rate = 0.0  # 이 비율만큼 429/500 오류로 응답 (네이버 API 만, GPT 경로 제외)
+    fixtures = {}
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def _inject_error(self):
+        if self.error_rate <= 0:
+            return False
+        with self.rng_lock:
+            roll, status = self.rng.random(), self.rng.choice((429, 500))
+        if roll >= self.error_rate:
+            return False
+        self._reply(status, {"errorMessage": "injected error", "errorCode": str(status)})
+        return True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply_stream(self, chunks):
+        # OpenAI 스트리밍과 같은 server-sent events (data: {...}\n\n ... data: [DONE])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                self.wfile.write(b"data: " + json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+                time.sleep(self.token_latency)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):  # 클라이언트가 스트리밍을 취소한 경우
+            pass
+        self.close_connection = True
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        if not url.path.startswith("/v1/search/"):
+            return self._reply(404, {"errorMessage": "not found"})
+        if self._inject_error():
+            return
+        fixture = self.fixtures.get(fixture_kind(url.path))
+        if fixture is not None:
+            return self._reply(200, fixture)
+        qs = parse_qs(url.query)
+        display = int(qs.get("display", ["10"])[0])
+        start = int(qs.get("start", ["1"])[0])
+        self._reply(200, _search_payload(qs.get("query", [""])[0], display, start))
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.startswith("/v1/chat/completions"):
+            if body.get("stream"):
+                return self._reply_stream(_chat_stream_chunks(_chat_payload(body)))
+            return self._reply(200, _chat_payload(body))
+        if not self.path.startswith("/v1/datalab/"):
+            return self._reply(404, {"errorMessage": "not found"})
+        if self._inject_error():
+            return
+        fixture = self.fixtures.get(fixture_kind(self.path))
+        if fixture is not None:
+            return self._reply(200, _fixture_datalab_payload(fixture, body))
+        self._reply(200, _datalab_payload(body))
+
+
+def start_stub_server(latency=0.0, port=0, token_latency=0.0, error_rate=0.0, fixtures_dir=None, seed=0):
+    """백그라운드 스레드로 스텁 서버를 띄우고 (server, base_url) 을 반환합니다. (오류 주입은 seed 로 재현 가능)"""
+    handler = type("ConfiguredNaverStubHandler", (NaverStubHandler,), {
+        "latency": latency, "token_latency": token_latency, "error_rate": error_rate,
+        "fixtures": load_fixtures(fixtures_dir) if fixtures_dir else {},
+        "rng": random.Random(seed), "rng_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 네이버 API 스텁 서버")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.02, help="GPT 스트리밍 조각 사이 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류 응답 비율 (0~1)")
+    parser.add_argument("--fixtures", help="저장된 응답 JSON 디렉터리")
+    args = parser.parse_args()
+    server, base_url = start_stub_server(args.latency, args.port, args.token_latency, args.error_rate, args.fixtures)
+    print(f"stub server: {base_url} (NAVER_API_BASE={base_url}, OPENAI_BASE_URL={base_url}/v1)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
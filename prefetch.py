@@ -0,0 +1,197 @@
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from grok_analysis import analyze_product_competitiveness
+from naver_analysis import (
+    get_naver_headers, analyze_search_trend, analyze_shopping_insight, analyze_competition_and_rarity,
+)
+from naver_cache import keep_warm
+from naver_scheduler import PREFETCH, QuotaScheduler, get_scheduler, priority
+
+# ----------------------------------------------------------------------
+# 관심 상품(워치리스트) 미리 받아두기
+# 자사 상품과 직접 경쟁 상품처럼 자주 조회하는 상품의 트렌드/인사이트/쇼핑/블로그/카페 응답을
+# 한가한 시간대에 다시 받아 캐시에 넣어 두어, 낮 시간 화면 조회가 모두 캐시 적중이 되게 합니다.
+#   NAVER_CLIENT_ID=... NAVER_CLIENT_SECRET=... python prefetch.py --window 2-6 --interval 24 --slice 0.2
+#   python prefetch.py --once                  # cron 등에서 한 번만 실행
+# 워치리스트(GOREMI_WATCHLIST, 기본 ./watchlist.txt): 한 줄에 화면에 입력하는 것과 같은 '상품명[,카테고리ID]',
+# '#' 뒤는 주석. 화면과 같은 검색어여야 캐시 키가 같아지므로 브랜드명이 아니라 상품 검색어를 적습니다.
+#     # 자사 상품
+#     타코와사비
+#     소라와사비,50000008
+#   카테고리 ID 는 Grok 화면 분석에만 쓰이고, 네이버 화면 분석은 화면과 같은 기본 카테고리로 받습니다.
+#   파일이 없거나 비어 있으면 미리 받을 상품이 없으므로 아무것도 하지 않습니다.
+#
+# 받은 응답은 keep_warm 으로 다음 실행 때까지(+여유) 유효하게 저장되고, 다음 실행에서는 그 전에 만료될 항목만 다시 받습니다.
+# 모든 호출은 prefetch 우선순위(naver_scheduler)로 보내며, 오늘 prefetch 로 쓴 양이 묶음별 일일 할당량의
+# quota_slice 비율에 이르면 남은 상품은 다음 실행으로 미룹니다.
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger("prefetch")
+
+DEFAULT_WATCHLIST_PATH = os.environ.get("GOREMI_WATCHLIST", "watchlist.txt")
+DEFAULT_GROK_CATEGORY_ID = "50000008"
+DEFAULT_WINDOW = (2, 6)        # 실행 시간대 [시작시, 끝시) - 끝이 시작보다 작으면 자정을 넘김
+DEFAULT_INTERVAL_HOURS = 24.0  # 실행 간격
+DEFAULT_QUOTA_SLICE = 0.2      # 묶음별 일일 할당량 중 미리 받기에 쓸 최대 비율
+WARM_MARGIN = 60 * 60          # 다음 실행이 늦어져도 캐시가 버티도록 더 주는 시간(초)
+POLL_SECONDS = 60
+
+
+def load_watchlist(path: str = DEFAULT_WATCHLIST_PATH) -> List[Tuple[str, Optional[str]]]:
+    """워치리스트 파일 -> [(상품명, 카테고리ID 또는 None)]. 파일이 없으면 빈 목록."""
+    if not os.path.exists(path):
+        logger.warning("워치리스트 파일이 없습니다: %s (미리 받을 상품 없음)", path)
+        return []
+    watchlist = []
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            product, _, category_id = (part.strip() for part in line.partition(","))
+            if product:
+                watchlist.append((product, category_id or None))
+    return list(dict.fromkeys(watchlist))
+
+
+def parse_window(text: str) -> Tuple[int, int]:
+    start, _, end = text.partition("-")
+    return int(start) % 24, int(end or start) % 24
+
+
+def in_window(now: datetime, window: Tuple[int, int]) -> bool:
+    start, end = window
+    if start == end:
+        return True  # 하루 종일
+    if start < end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+
+def next_run_after(now: datetime, interval_hours: float, window: Tuple[int, int]) -> datetime:
+    """now 로부터 interval 이 지난 뒤 처음으로 실행 시간대에 들어가는 시각 (정시 단위)."""
+    candidate = now + timedelta(hours=interval_hours)
+    for _ in range(48):
+        if in_window(candidate, window):
+            return candidate
+        candidate = (candidate + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    return candidate
+
+
+class Prefetcher:
+    def __init__(self, client_id: str, client_secret: str, watchlist: List[Tuple[str, Optional[str]]],
+                 interval_hours: float = DEFAULT_INTERVAL_HOURS, window: Tuple[int, int] = DEFAULT_WINDOW,
+                 quota_slice: float = DEFAULT_QUOTA_SLICE, scheduler: Optional[QuotaScheduler] = None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.watchlist = watchlist
+        self.interval_hours = interval_hours
+        self.window = window
+        self.quota_slice = quota_slice
+        self.scheduler = scheduler
+        self.last_run: Optional[datetime] = None
+        self.last_summary: Dict = {}
+
+    def slice_exhausted(self) -> Optional[str]:
+        """오늘 prefetch 로 쓴 양이 할당량 조각을 넘은 묶음 이름 (없으면 None)."""
+        for family, s in (self.scheduler or get_scheduler()).snapshot().items():
+            if s.get(f"used_{PREFETCH}", 0) >= s["daily_quota"] * self.quota_slice:
+                return family
+        return None
+
+    def warm_product(self, product: str, category_id: Optional[str]) -> None:
+        """두 화면이 보내는 것과 같은 요청을 그대로 다시 보냅니다. (같은 캐시 키)"""
+        analyze_product_competitiveness(product, self.client_id, self.client_secret,
+                                        category_id or DEFAULT_GROK_CATEGORY_ID)
+        headers = get_naver_headers(self.client_id, self.client_secret)
+        analyze_search_trend(product, headers)
+        analyze_shopping_insight(product, headers)
+        analyze_competition_and_rarity(product, headers)
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict:
+        now = now or datetime.now()
+        ttl = (next_run_after(now, self.interval_hours, self.window) - now).total_seconds() + WARM_MARGIN
+        started = time.perf_counter()
+        warmed, deferred = [], []
+        with priority(PREFETCH), keep_warm(ttl):
+            for product, category_id in self.watchlist:
+                family = self.slice_exhausted()
+                if family is not None:
+                    deferred = [p for p, _ in self.watchlist[len(warmed):]]
+                    logger.warning("%s 할당량 조각(%.0f%%) 소진: %d개 상품은 다음 실행으로 미룸",
+                                   family, self.quota_slice * 100, len(deferred))
+                    break
+                try:
+                    self.warm_product(product, category_id)
+                except Exception as e:  # 한 상품 실패가 나머지를 막지 않도록
+                    logger.error("%s 미리 받기 실패: %s", product, e)
+                warmed.append(product)
+        self.last_run = now
+        self.last_summary = {"started_at": now.isoformat(timespec="seconds"), "warmed": len(warmed),
+                             "deferred": deferred, "keep_warm_s": round(ttl),
+                             "elapsed_s": round(time.perf_counter() - started, 2)}
+        logger.info("미리 받기 완료: %d개 (미룸 %d개, %.1fs, 캐시 유지 %.1f시간)",
+                    len(warmed), len(deferred), self.last_summary["elapsed_s"], ttl / 3600)
+        return self.last_summary
+
+    def due(self, now: datetime) -> bool:
+        if not in_window(now, self.window):
+            return False
+        return self.last_run is None or now - self.last_run >= timedelta(hours=self.interval_hours) - timedelta(minutes=1)
+
+    def run_forever(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            now = datetime.now()
+            if self.due(now):
+                self.run_once(now)
+            stop.wait(POLL_SECONDS)
+
+
+def start_prefetcher(prefetcher: Prefetcher) -> threading.Event:
+    """백그라운드 데몬 스레드로 일정에 맞춰 실행합니다. 돌려받은 Event 를 set() 하면 멈춥니다."""
+    stop = threading.Event()
+    threading.Thread(target=prefetcher.run_forever, args=(stop,), name="prefetch", daemon=True).start()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관심 상품 네이버 응답 미리 받기")
+    parser.add_argument("--watchlist", default=DEFAULT_WATCHLIST_PATH, help="한 줄에 '상품명[,카테고리ID]'")
+    parser.add_argument("--window", default=f"{DEFAULT_WINDOW[0]}-{DEFAULT_WINDOW[1]}", help="실행 시간대 (예: 2-6, 22-5)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_HOURS, help="실행 간격(시간)")
+    parser.add_argument("--slice", type=float, default=DEFAULT_QUOTA_SLICE, help="일일 할당량 중 쓸 최대 비율 (0~1)")
+    parser.add_argument("--once", action="store_true", help="시간대와 관계없이 지금 한 번만 실행")
+    parser.add_argument("--client-id", default=os.environ.get("NAVER_CLIENT_ID", ""))
+    parser.add_argument("--client-secret", default=os.environ.get("NAVER_CLIENT_SECRET", ""))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.client_id or not args.client_secret:
+        parser.error("네이버 API 키가 필요합니다 (--client-id/--client-secret 또는 NAVER_CLIENT_ID/NAVER_CLIENT_SECRET).")
+
+    watchlist = load_watchlist(args.watchlist)
+    if not watchlist:
+        parser.error(f"미리 받을 상품이 없습니다. {args.watchlist} 에 한 줄에 '상품명[,카테고리ID]' 로 적어 주세요.")
+    prefetcher = Prefetcher(args.client_id, args.client_secret, watchlist,
+                            args.interval, parse_window(args.window), args.slice)
+    if args.once:
+        summary = prefetcher.run_once()
+        return 1 if summary["deferred"] else 0
+    stop = start_prefetcher(prefetcher)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop.set()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import argparse
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# ----------------------------------------------------------------------
+# 경쟁 상품 가격 이력 (열 지향 저장소 + 색인)
+# 네이버 쇼핑 검색으로 새로 받은 상품(productId, 판매처, 최저가 등)을 버리지 않고 Parquet 로 쌓아
+# API 를 다시 부르지 않고도 경쟁 상품의 가격 변화를 조회합니다.
+#   python price_history.py 타코와사비 --months 6 --top 20    # 상위 경쟁 상품 20개의 가격 추이
+#   python price_history.py --compact                          # 작은 조각 파일 합치기
+#
+# 배치: <루트>/keyword=<키워드 해시>/month=YYYY-MM/part-*.parquet (검색어 x 월 파티션, zstd 압축)
+# 색인(index.sqlite3): (키워드, productId) 별 처음/마지막 관측일, 관측 횟수, 최근 상품명/판매처/가격과
+#   파티션 파일 목록. 추이 조회는 색인에서 상위 상품과 기간 안의 파일만 골라 필요한 열만 읽습니다.
+# 기록은 naver_cache.cached_call 이 쇼핑 검색을 새로 받았을 때(캐시 적중은 제외) 큐에 넣고,
+# 백그라운드 스레드가 FLUSH_SECONDS 마다 모아서 파티션별로 한 파일씩 씁니다. pyarrow 가 없으면 기록하지 않습니다.
+# GOREMI_PRICE_HISTORY_PATH="" 이면 기록하지 않습니다. (벤치마크 등)
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger("price_history")
+
+DEFAULT_HISTORY_PATH = os.environ.get("GOREMI_PRICE_HISTORY_PATH", os.path.join(".cache", "price_history"))
+FLUSH_SECONDS = 5.0
+COMPACT_PARTS = 8  # 파티션 안의 조각 파일이 이만큼 쌓이면 하나로 합침
+
+_TAG_PATTERN = re.compile(r"<[^<]+?>")
+_QUOTES = "\"'“”‘’"
+
+
+def normalize_keyword(query: str) -> str:
+    """'"타코와사비"' 처럼 따옴표로 감싼 정확 검색어도 같은 키워드로 봅니다."""
+    return " ".join(unicodedata.normalize("NFKC", query).strip().strip(_QUOTES).split()).lower()
+
+
+def keyword_slug(keyword: str) -> str:
+    return hashlib.sha1(keyword.encode("utf-8")).hexdigest()[:16]
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(float(value)) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("day", pa.date32()),
+        ("product_id", pa.int64()),
+        ("rank", pa.int16()),
+        ("lprice", pa.int32()),
+        ("hprice", pa.int32()),
+        ("mall", pa.dictionary(pa.int32(), pa.string())),
+        ("brand", pa.dictionary(pa.int32(), pa.string())),
+        ("title", pa.string()),
+    ])
+
+
+class PriceHistory:
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.enabled = True
+        self._queue: "queue.Queue[Tuple[str, date, List[Dict]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " keyword TEXT NOT NULL, product_id INTEGER NOT NULL,"
+            " first_day TEXT NOT NULL, last_day TEXT NOT NULL, observations INTEGER NOT NULL, rank_sum INTEGER NOT NULL,"
+            " title TEXT, mall TEXT, lprice INTEGER,"
+            " PRIMARY KEY (keyword, product_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_products_id ON products(product_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parts ("
+            " keyword TEXT NOT NULL, month TEXT NOT NULL, file TEXT NOT NULL, rows INTEGER NOT NULL,"
+            " PRIMARY KEY (keyword, month, file))"
+        )
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+
+    def append(self, query: str, items: Iterable[Dict], start: int = 1, day: Optional[date] = None) -> None:
+        """쇼핑 검색 응답 items 를 기록 큐에 넣습니다. start 는 응답의 첫 순위(검색 start 파라미터)."""
+        if not self.enabled:
+            return
+        rows = []
+        for offset, item in enumerate(items):
+            product_id = _to_int(item.get("productId"))
+            if product_id is None:
+                continue
+            rows.append({
+                "product_id": product_id, "rank": start + offset,
+                "lprice": _to_int(item.get("lprice")), "hprice": _to_int(item.get("hprice")),
+                "mall": item.get("mallName") or "", "brand": item.get("brand") or "",
+                "title": _TAG_PATTERN.sub("", item.get("title", "")),
+            })
+        if rows:
+            self._queue.put((normalize_keyword(query), day or date.today(), rows))
+            self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="price-history", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except ImportError:
+                logger.warning("pyarrow 가 없어 가격 이력을 기록하지 않습니다.")
+                self.enabled = False
+                return
+            except Exception:
+                logger.exception("가격 이력 기록 실패")
+
+    def flush(self) -> int:
+        """큐에 쌓인 관측을 (키워드, 월) 파티션별로 파일 하나씩 씁니다. 기록한 행 수를 반환."""
+        batches: Dict[Tuple[str, str], List[Tuple[date, Dict]]] = {}
+        while True:
+            try:
+                keyword, day, rows = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault((keyword, day.strftime("%Y-%m")), []).extend((day, row) for row in rows)
+        if not batches:
+            return 0
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        written = 0
+        with self._lock:
+            for (keyword, month), observations in batches.items():
+                directory = os.path.join(self.path, f"keyword={keyword_slug(keyword)}", f"month={month}")
+                os.makedirs(directory, exist_ok=True)
+                columns = {name: [row[name] for _, row in observations]
+                           for name in ("product_id", "rank", "lprice", "hprice", "mall", "brand", "title")}
+                columns["day"] = [day for day, _ in observations]
+                table = pa.Table.from_pydict(columns, schema=_schema())
+                name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+                pq.write_table(table, os.path.join(directory, name), compression="zstd")
+                self._index(keyword, month, name, observations)
+                written += len(observations)
+                if self._conn.execute("SELECT COUNT(*) FROM parts WHERE keyword = ? AND month = ?",
+                                      (keyword, month)).fetchone()[0] >= COMPACT_PARTS:
+                    self._compact_partition(keyword, month)
+        return written
+
+    def _index(self, keyword: str, month: str, name: str, observations: List[Tuple[date, Dict]]) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("INSERT INTO parts (keyword, month, file, rows) VALUES (?, ?, ?, ?)",
+                               (keyword, month, name, len(observations)))
+            self._conn.executemany(
+                "INSERT INTO products (keyword, product_id, first_day, last_day, observations, rank_sum, title, mall, lprice)"
+                " VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)"
+                " ON CONFLICT(keyword, product_id) DO UPDATE SET"
+                " first_day = MIN(first_day, excluded.first_day), last_day = MAX(last_day, excluded.last_day),"
+                " observations = observations + 1, rank_sum = rank_sum + excluded.rank_sum,"
+                " title = CASE WHEN excluded.last_day >= last_day THEN excluded.title ELSE title END,"
+                " mall = CASE WHEN excluded.last_day >= last_day THEN excluded.mall ELSE mall END,"
+                " lprice = CASE WHEN excluded.last_day >= last_day THEN excluded.lprice ELSE lprice END",
+                [(keyword, row["product_id"], day.isoformat(), day.isoformat(), row["rank"], row["title"], row["mall"],
+                  row["lprice"]) for day, row in observations],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _compact_partition(self, keyword: str, month: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.join(self.path, f"keyword={keyword_slug(keyword)}", f"month={month}")
+        files = [row[0] for row in self._conn.execute(
+            "SELECT file FROM parts WHERE keyword = ? AND month = ? ORDER BY file", (keyword, month))]
+        if len(files) < 2:
+            return
+        table = pa.concat_tables([pq.read_table(os.path.join(directory, f)) for f in files])
+        table = table.sort_by([("product_id", "ascending"), ("day", "ascending")])
+        name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}-compact.parquet"
+        pq.write_table(table, os.path.join(directory, name), compression="zstd")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany("DELETE FROM parts WHERE keyword = ? AND month = ? AND file = ?",
+                                   [(keyword, month, f) for f in files])
+            self._conn.execute("INSERT INTO parts (keyword, month, file, rows) VALUES (?, ?, ?, ?)",
+                               (keyword, month, name, table.num_rows))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        for f in files:
+            os.remove(os.path.join(directory, f))
+
+    def compact(self) -> int:
+        """조각 파일이 2개 이상인 모든 파티션을 합칩니다. 합친 파티션 수를 반환."""
+        self.flush()
+        with self._lock:
+            partitions = self._conn.execute(
+                "SELECT keyword, month FROM parts GROUP BY keyword, month HAVING COUNT(*) > 1").fetchall()
+            for keyword, month in partitions:
+                self._compact_partition(keyword, month)
+        return len(partitions)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def top_competitors(self, query: str, limit: int = 20, since: Optional[date] = None) -> List[Dict]:
+        """자주(그리고 상위 순위로) 관측된 상품 순. since 이후에 관측된 상품만."""
+        rows = self._conn.execute(
+            "SELECT product_id, title, mall, lprice, first_day, last_day, observations, rank_sum * 1.0 / observations"
+            " FROM products WHERE keyword = ? AND last_day >= ?"
+            " ORDER BY observations DESC, rank_sum * 1.0 / observations ASC LIMIT ?",
+            (normalize_keyword(query), (since or date.min).isoformat(), limit),
+        ).fetchall()
+        fields = ("product_id", "title", "mall", "lprice", "first_day", "last_day", "observations", "avg_rank")
+        return [dict(zip(fields, row)) for row in rows]
+
+    def _files(self, keyword: str, first_month: str, last_month: str) -> List[str]:
+        directory = os.path.join(self.path, f"keyword={keyword_slug(keyword)}")
+        return [os.path.join(directory, f"month={month}", name) for month, name in self._conn.execute(
+            "SELECT month, file FROM parts WHERE keyword = ? AND month BETWEEN ? AND ? ORDER BY month",
+            (keyword, first_month, last_month))]
+
+    def trajectory(self, query: str, months: int = 6, top: int = 20,
+                   product_ids: Optional[Iterable[int]] = None, today: Optional[date] = None) -> Dict[int, Dict]:
+        """
+        최근 months 개월 동안 상품별 일자별 최저가 추이.
+        product_ids 가 없으면 top_competitors 상위 top 개. 반환: {productId: {title, mall, points: [(day, lprice)]}}
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        self.flush()
+        today = today or date.today()
+        index = today.year * 12 + today.month - 1 - (months - 1)
+        first_month = f"{index // 12:04d}-{index % 12 + 1:02d}"
+        since = date(index // 12, index % 12 + 1, 1)
+        keyword = normalize_keyword(query)
+        if product_ids is not None:
+            product_ids = sorted(set(product_ids))  # 제너레이터도 받을 수 있게 한 번만 읽음
+            if not product_ids:
+                return {}
+        # 색인 조회부터 파일 스캔까지 잠금 안에서: 기록 스레드의 합치기(_compact_partition)가 조각 파일을 지우는 중에
+        # 목록을 만들거나 읽지 않도록 함 (스캔은 수십 ms 라 기록이 그만큼만 밀림)
+        with self._lock:
+            if product_ids is None:
+                meta = {row["product_id"]: row for row in self.top_competitors(keyword, top, since)}
+            else:
+                placeholders = ",".join("?" * len(product_ids))
+                meta = {row[0]: {"product_id": row[0], "title": row[1], "mall": row[2]} for row in self._conn.execute(
+                    f"SELECT product_id, title, mall FROM products WHERE keyword = ? AND product_id IN ({placeholders})",
+                    (keyword, *product_ids))}
+            files = self._files(keyword, first_month, today.strftime("%Y-%m"))
+            if not meta or not files:
+                return {}
+
+            # 파일 여러 개를 한 번에 스캔 (멀티스레드) - productId/day 조건은 행 그룹 통계로 먼저 걸러짐
+            table = ds.dataset(files, format="parquet").to_table(
+                columns=["day", "product_id", "lprice"],
+                filter=(pc.field("product_id").isin(list(meta)) & (pc.field("day") >= pa.scalar(since, pa.date32()))
+                        & pc.field("lprice").is_valid()))
+        if not table.num_rows:
+            return {}
+        daily = table.group_by(["product_id", "day"]).aggregate([("lprice", "min")]).sort_by(
+            [("product_id", "ascending"), ("day", "ascending")])
+
+        result: Dict[int, Dict] = {}
+        for product_id, day, price in zip(daily["product_id"].to_pylist(), daily["day"].to_pylist(),
+                                          daily["lprice_min"].to_pylist()):
+            entry = result.setdefault(product_id, {"title": meta[product_id]["title"], "mall": meta[product_id]["mall"],
+                                                   "points": []})
+            entry["points"].append((day, price))
+        return result
+
+    def product_keywords(self, product_id: int) -> List[Dict]:
+        """productId 가 관측된 검색어 목록 (productId 색인 사용)."""
+        rows = self._conn.execute(
+            "SELECT keyword, first_day, last_day, observations FROM products WHERE product_id = ? ORDER BY last_day DESC",
+            (product_id,)).fetchall()
+        return [dict(zip(("keyword", "first_day", "last_day", "observations"), row)) for row in rows]
+
+
+def record_shop_response(payload: Optional[Dict[str, Any]], data: Dict[str, Any]) -> None:
+    """naver_cache.cached_call 이 쇼핑 검색을 새로 받았을 때 부릅니다. (기록 실패가 분석을 막지 않음)"""
+    query = (payload or {}).get("query")
+    if not DEFAULT_HISTORY_PATH or not query or not data.get("items"):
+        return
+    try:
+        get_history().append(str(query), data["items"], start=_to_int((payload or {}).get("start")) or 1)
+    except Exception:
+        logger.exception("가격 이력 큐 추가 실패")
+
+
+_default_history = None
+_default_history_lock = threading.Lock()
+
+
+def get_history() -> PriceHistory:
+    """프로세스 공용 가격 이력 (GOREMI_PRICE_HISTORY_PATH). 종료 시 남은 큐를 기록합니다."""
+    global _default_history
+    with _default_history_lock:
+        if _default_history is None:
+            _default_history = PriceHistory()
+            atexit.register(_flush_at_exit, _default_history)
+        return _default_history
+
+
+def _flush_at_exit(history: PriceHistory) -> None:
+    try:
+        history.flush()
+    except Exception:  # 종료 중에는 기록 실패를 조용히 넘김
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경쟁 상품 가격 이력 조회")
+    parser.add_argument("query", nargs="?", help="검색어 (예: 타코와사비)")
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--path", default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--compact", action="store_true", help="파티션별 조각 파일을 하나로 합침")
+    args = parser.parse_args()
+
+    history = PriceHistory(args.path)
+    if args.compact:
+        print(f"{history.compact()}개 파티션 정리")
+    if not args.query:
+        return 0
+    started = time.perf_counter()
+    trajectories = history.trajectory(args.query, args.months, args.top)
+    elapsed = (time.perf_counter() - started) * 1000
+    for product_id, entry in trajectories.items():
+        points = entry["points"]
+        change = (points[-1][1] - points[0][1]) / points[0][1] * 100 if points[0][1] else 0.0
+        print(f"{product_id:>14}  {entry['mall'][:12]:<12} {entry['title'][:30]:<30} "
+              f"{points[0][1]:>8,} -> {points[-1][1]:>8,} 원 ({change:+.1f}%, {len(points)}일)")
+    print(f"{len(trajectories)}개 상품, {elapsed:.1f} ms ({datetime.now():%Y-%m-%d %H:%M})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
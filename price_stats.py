@@ -0,0 +1,96 @@
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from keyword_scanner import extract_prices
+
+# ----------------------------------------------------------------------
+# 경쟁 상품 가격 분포 통계
+# 쇼핑 검색 결과의 lprice/hprice 와 스니펫의 'OO원' 가격을 모아
+# 이상치를 제거한 뒤 분위수와 g당 가격을 NumPy 벡터 연산으로 계산합니다.
+# NumPy 는 처음 계산할 때 불러와 import 만 하는 배치 워커/서비스의 기동 시간을 늘리지 않습니다.
+# ----------------------------------------------------------------------
+
+# 500g, 1.2kg, 300 g ...
+WEIGHT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(kg|g)(?![a-z])', re.IGNORECASE)
+# x2, X 3, 2개, 3팩, 5입
+COUNT_PATTERN = re.compile(r'(?:[xX×]\s*(\d+)(?!\s*(?:kg|g))|(\d+)\s*(?:개|팩|입|봉))')
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90)
+IQR_FACTOR = 1.5
+
+
+def parse_grams(title: str) -> Optional[float]:
+    """상품명에서 총 중량(g)을 추정합니다. 예) '타코와사비 500g x 2' -> 1000.0"""
+    match = WEIGHT_PATTERN.search(title or "")
+    if not match:
+        return None
+    grams = float(match.group(1)) * (1000.0 if match.group(2).lower() == "kg" else 1.0)
+    count = COUNT_PATTERN.search(title[match.end():]) or COUNT_PATTERN.search(title[:match.start()])
+    if count:
+        grams *= int(count.group(1) or count.group(2))
+    return grams if grams > 0 else None
+
+
+def _to_price(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def remove_outliers(values: "np.ndarray", factor: float = IQR_FACTOR) -> "np.ndarray":
+    """IQR(사분위 범위) 밖의 값을 제거합니다. 표본이 4개 미만이면 그대로 둡니다."""
+    import numpy as np
+    if values.size < 4:
+        return values
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = (q3 - q1) * factor
+    return values[(values >= q1 - spread) & (values <= q3 + spread)]
+
+
+def competitor_price_stats(shop_items: Iterable[Dict], snippets: Iterable[str] = ()) -> Dict[str, float]:
+    """
+    shop_items: 네이버 쇼핑 검색 items (lprice/hprice/title)
+    snippets: 가격이 적혀 있을 수 있는 본문 텍스트 (블로그/뉴스 스니펫 등)
+    반환: count(이상치 제거 후), outliers, mean, p10~p90, min/max, per_gram_median(해석 가능한 경우)
+    """
+    import numpy as np
+    items = list(shop_items)
+    lprices = np.array([_to_price(item.get("lprice")) for item in items], dtype=np.float64)
+    hprices = np.array([_to_price(item.get("hprice")) for item in items], dtype=np.float64)
+    snippet_prices = np.array([p for text in snippets for p in extract_prices(text)], dtype=np.float64)
+    prices = np.concatenate([lprices[lprices > 0], hprices[hprices > 0], snippet_prices])
+    if prices.size == 0:
+        return {"count": 0, "outliers": 0}
+
+    kept = remove_outliers(prices)
+    stats = {"count": int(kept.size), "outliers": int(prices.size - kept.size), "mean": float(kept.mean()),
+             "min": float(kept.min()), "max": float(kept.max())}
+    for pct, value in zip(PERCENTILES, np.percentile(kept, PERCENTILES)):
+        stats[f"p{pct}"] = float(value)
+    stats["median"] = stats["p50"]
+
+    grams = np.array([parse_grams(item.get("title", "")) or np.nan for item in items], dtype=np.float64)
+    valid = (lprices > 0) & ~np.isnan(grams)
+    if valid.any():
+        per_gram = remove_outliers(lprices[valid] / grams[valid])
+        stats["per_gram_median"] = float(np.median(per_gram))
+        stats["per_gram_count"] = int(per_gram.size)
+    return stats
+
+
+def summarize_price_stats(stats: Dict[str, float]) -> List[str]:
+    """화면 표시용 요약 문장."""
+    if not stats.get("count"):
+        return ["경쟁 상품 가격 정보를 찾을 수 없습니다."]
+    lines = [
+        f"경쟁 가격 {stats['count']}건 (이상치 {stats['outliers']}건 제외): "
+        f"중앙값 **{stats['median']:,.0f}원**, P25 {stats['p25']:,.0f}원 ~ P75 {stats['p75']:,.0f}원 "
+        f"(P10 {stats['p10']:,.0f}원 / P90 {stats['p90']:,.0f}원)"
+    ]
+    if "per_gram_median" in stats:
+        lines.append(f"g당 가격 중앙값 **{stats['per_gram_median']:,.1f}원** ({stats['per_gram_count']}개 상품 기준)")
+    return lines
@@ -0,0 +1,50 @@
+import numpy as np
+
+# ----------------------------------------------------------------------
+# 고래미 단가 등급표 (판매가 대비 비율)
+# 판매가/도매가 배열을 받아 모든 등급 단가를 NumPy 한 번에 계산합니다.
+# ----------------------------------------------------------------------
+
+WHOLESALE_RATIO = 0.58
+
+# (표시 이름, 판매가 대비 비율)
+TIER_TABLE = [
+    ("📦 판매가", 1.00),
+    ("🏢 사업자가(24%)", 0.76),
+    ("🧾 도매가(42%)", WHOLESALE_RATIO),
+    ("📦 박스가(일반)", 0.70),
+    ("📦 박스가(사업자)", 0.60),
+    ("📦 박스가(도매)", 0.52),
+    ("🏬 픽업가(일반)", 0.60),
+    ("🏬 픽업가(사업자)", 0.50),
+    ("🏬 픽업가(도매)", 0.42),
+]
+TIER_LABELS = [label for label, _ in TIER_TABLE]
+TIER_RATIOS = np.array([ratio for _, ratio in TIER_TABLE])
+WHOLESALE_INDEX = TIER_LABELS.index("🧾 도매가(42%)")
+
+
+def compute_tiers(prices, basis="selling"):
+    """
+    prices: 판매가(basis="selling") 또는 도매가(basis="wholesale") 배열
+    반환: (N, 9) 정수 배열. 열 순서는 TIER_LABELS.
+    도매가 기준이면 판매가 = round(도매가 / 0.58) 로 환산하고, 도매가 열은 입력값을 그대로 둡니다.
+    (반올림은 파이썬 round 와 같은 짝수 반올림)
+    """
+    prices = np.asarray(prices, dtype=np.float64).reshape(-1)
+    if basis == "wholesale":
+        selling = np.round(prices / WHOLESALE_RATIO)
+    elif basis == "selling":
+        selling = prices
+    else:
+        raise ValueError(f"알 수 없는 기준: {basis}")
+    tiers = np.round(selling[:, None] * TIER_RATIOS[None, :])
+    if basis == "wholesale":
+        tiers[:, WHOLESALE_INDEX] = prices
+    return tiers.astype(np.int64)
+
+
+def compute_tier_dict(price, basis="selling"):
+    """단일 가격용: {등급 이름: 단가}"""
+    row = compute_tiers([price], basis)[0]
+    return {label: int(value) for label, value in zip(TIER_LABELS, row)}
@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Hashable, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from batch_pricing import DEFAULT_CATEGORY_ID, AnalysisFailed, analyze_product, apply_margin
+from gpt_pricing import normalize_product_name
+from grok_analysis import calculate_prices
+from naver_analysis import get_naver_headers
+from naver_cache import get_cache
+from naver_scheduler import QuotaExhausted, get_scheduler, track_denials
+
+# ----------------------------------------------------------------------
+# 가격 제안 HTTP/JSON 서비스 (Streamlit 없이 실행)
+#   NAVER_CLIENT_ID=... NAVER_CLIENT_SECRET=... python pricing_service.py --port 8080 --workers 8
+#   curl -s -XPOST localhost:8080/v1/price -d '{"product": "타코와사비", "cost": 3500}'
+#   curl -s 'localhost:8080/v1/price?product=타코와사비&cost=3500'
+# 분석(batch_pricing.analyze_product: 트렌드/쇼핑 인사이트/경쟁·희소성/경쟁 가격 중앙값)은 원가와 무관하므로
+# (정규화된 상품명, 카테고리) 단위로 진행 중인 요청을 하나로 합치고(singleflight), 마진/단가만 요청별 원가로 계산합니다.
+#   GET /v1/stats  -> 진행 중/시작/합쳐진 분석 수, 응답 캐시 통계, 남은 네이버 할당량,  GET /healthz
+# 응답 코드: 잘못된 입력 400, 네이버 데이터를 받지 못함 502, 할당량 부족 503, 분석 시간 초과 504
+# ----------------------------------------------------------------------
+
+logger = logging.getLogger("pricing_service")
+
+DEFAULT_WORKERS = 8
+ANALYSIS_TIMEOUT = 60.0  # 분석 한 건을 기다리는 최대 시간(초)
+
+
+def quote(analysis: Dict[str, Any], cost: float) -> Dict[str, Any]:
+    """공유된 분석 결과 + 요청별 원가 -> 제안 마진/판매가(suggest_margin)와 단가표(calculate_prices)."""
+    result = apply_margin(analysis, cost)
+    result["prices"] = calculate_prices(cost, result["suggested_margin"])
+    return result
+
+
+def flight_key(product: str, category_id: str) -> Tuple[str, str]:
+    return normalize_product_name(product), category_id
+
+
+class SingleFlight:
+    """
+    같은 키의 작업이 진행 중이면 새로 시작하지 않고 그 결과를 함께 기다립니다.
+    작업은 고정 크기 스레드 풀에서 실행되고, 끝나면 키를 비워 다음 요청은 새로 실행합니다.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pricing")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def submit(self, key: Hashable, fn: Callable[[], Any]) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._pool.submit(fn)
+            self._in_flight[key] = future
+            self.started += 1
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._in_flight), "started": self.started, "coalesced": self.coalesced}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class PricingService:
+    """HTTP 와 무관한 서비스 본체. 테스트나 다른 파이썬 코드에서 바로 호출할 수 있습니다."""
+
+    def __init__(self, headers: Dict[str, str], workers: int = DEFAULT_WORKERS,
+                 analyze: Callable[[str, str, Dict[str, str]], Dict[str, Any]] = analyze_product):
+        self.headers = headers
+        self.analyze = analyze
+        self.flights = SingleFlight(workers)
+
+    def price(self, product: str, cost: float, category_id: str = DEFAULT_CATEGORY_ID,
+              timeout: float = ANALYSIS_TIMEOUT) -> Dict[str, Any]:
+        product = (product or "").strip()
+        if not product:
+            raise ValueError("product 가 필요합니다.")
+        if not math.isfinite(cost) or cost <= 0:
+            raise ValueError("cost 는 0보다 큰 유한한 숫자여야 합니다.")
+        category_id = (category_id or DEFAULT_CATEGORY_ID).strip()
+        future = self.flights.submit(flight_key(product, category_id),
+                                     lambda: self._analyze(product, category_id))
+        try:
+            analysis = future.result(timeout=timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"{product} 분석이 {timeout:.0f}초 안에 끝나지 않았습니다.") from None
+        return quote(analysis, cost)
+
+    def _analyze(self, product: str, category_id: str) -> Dict[str, Any]:
+        """데이터가 비어 실패한 분석이 할당량 부족 때문이었다면 QuotaExhausted(503)로 바꿔 알립니다."""
+        with track_denials() as denials:
+            try:
+                return self.analyze(product, category_id, self.headers)
+            except AnalysisFailed:
+                if denials:
+                    raise denials[0] from None
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {"flights": self.flights.stats(), "cache": get_cache().stats(), "quota": get_scheduler().snapshot()}
+
+
+def _parse_request(handler: BaseHTTPRequestHandler) -> Dict[str, Any]:
+    url = urlparse(handler.path)
+    if handler.command == "GET":
+        return {k: v[0] for k, v in parse_qs(url.query).items()}
+    length = int(handler.headers.get("Content-Length", 0))
+    request = json.loads(handler.rfile.read(length) or b"{}")
+    if not isinstance(request, dict):
+        raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+    return request
+
+
+class PricingHandler(BaseHTTPRequestHandler):
+    service: PricingService = None
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        path = urlparse(self.path).path
+        if path == "/healthz":
+            return self._reply(200, {"ok": True})
+        if path == "/v1/stats":
+            return self._reply(200, self.service.stats())
+        if path != "/v1/price":
+            return self._reply(404, {"error": "not found"})
+        started = time.perf_counter()
+        try:
+            request = _parse_request(self)
+            result = self.service.price(str(request.get("product", "")), float(request.get("cost", 0)),
+                                        str(request.get("category_id") or DEFAULT_CATEGORY_ID))
+        except (ValueError, TypeError) as e:
+            return self._reply(400, {"error": str(e)})
+        except AnalysisFailed as e:
+            return self._reply(502, {"error": str(e), "stage": e.stage})
+        except QuotaExhausted as e:
+            return self._reply(503, {"error": str(e)})
+        except TimeoutError:
+            return self._reply(504, {"error": "analysis timed out"})
+        except Exception as e:  # 분석 중 예상하지 못한 오류
+            logger.exception("가격 제안 실패")
+            return self._reply(500, {"error": str(e)})
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self._reply(200, result)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def start_service(service: PricingService, host: str = "127.0.0.1", port: int = 0):
+    """백그라운드 스레드로 서비스를 띄우고 (server, base_url) 을 반환합니다."""
+    handler = type("ConfiguredPricingHandler", (PricingHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가격 제안 HTTP/JSON 서비스")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 분석할 상품 수")
+    parser.add_argument("--client-id", default=os.environ.get("NAVER_CLIENT_ID", ""))
+    parser.add_argument("--client-secret", default=os.environ.get("NAVER_CLIENT_SECRET", ""))
+    parser.add_argument("--prefetch", action="store_true", help="관심 상품 미리 받기(prefetch.py)를 기본 일정으로 함께 실행")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.client_id or not args.client_secret:
+        parser.error("네이버 API 키가 필요합니다 (--client-id/--client-secret 또는 NAVER_CLIENT_ID/NAVER_CLIENT_SECRET).")
+
+    service = PricingService(get_naver_headers(args.client_id, args.client_secret), args.workers)
+    server, base_url = start_service(service, args.host, args.port)
+    logger.info("가격 제안 서비스: %s/v1/price", base_url)
+    if args.prefetch:
+        from prefetch import Prefetcher, load_watchlist, start_prefetcher
+        watchlist = load_watchlist()
+        if watchlist:
+            start_prefetcher(Prefetcher(args.client_id, args.client_secret, watchlist))
+        else:
+            logger.warning("워치리스트가 비어 있어 미리 받기를 시작하지 않습니다.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        service.flights.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
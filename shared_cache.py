@@ -0,0 +1,81 @@
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+# ----------------------------------------------------------------------
+# 세션 간 공유 분석 결과 캐시 (Streamlit 앱 전용)
+# st.cache_data 위에 얹은 데코레이터로, 같은 제품/파라미터 조회는 모든 사용자가 결과를 공유합니다.
+# - secret_params 로 지정한 인자(API 키, 인증 헤더)는 캐시 키에 넣지 않습니다.
+# - failed(result) 가 참인 결과(API 실패 등)는 저장하지 않아, 잘못된 키 하나가 다른 사용자에게 번지지 않습니다.
+# - st.cache_data 는 같은 키의 계산이 진행 중이어도 합쳐 주지 않으므로, 키별 잠금으로 첫 호출만 계산하고
+#   동시에 들어온 나머지는 기다렸다가 캐시된 결과를 씁니다. (pricing_service.SingleFlight 와 같은 역할)
+# ----------------------------------------------------------------------
+
+ANALYSIS_TTL = 60 * 60      # 분석 결과 유지 시간(초)
+ANALYSIS_MAX_ENTRIES = 500  # 함수별 최대 보관 건수 (초과 시 오래된 것부터 제거)
+
+
+class _NotCached(Exception):
+    def __init__(self, result):
+        super().__init__("result not cached")
+        self.result = result
+
+
+class _KeyLocks:
+    """키별 잠금. 기다리는 호출이 없어지면 항목을 지워 키가 늘어나도 쌓이지 않습니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}  # key -> [잠금, 사용 중인 호출 수]
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+def shared_cache(ttl=ANALYSIS_TTL, max_entries=ANALYSIS_MAX_ENTRIES, secret_params=(), failed=None):
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def call(public, _secrets):
+            result = func(**public, **_secrets)
+            if failed is not None and failed(result):
+                raise _NotCached(result)
+            return result
+
+        # st.cache_data 는 모듈+이름+소스로 함수를 구분하므로 감싸는 함수마다 이름을 따로 붙임
+        call.__module__ = func.__module__
+        call.__qualname__ = f"{func.__qualname__}.<shared_cache>"
+        cached = st.cache_data(ttl=ttl, max_entries=max_entries, show_spinner=False)(call)
+        locks = _KeyLocks()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            public = {k: v for k, v in bound.arguments.items() if k not in secret_params}
+            secrets = {k: v for k, v in bound.arguments.items() if k in secret_params}
+            # 진행 중인 같은 조회가 있으면 끝날 때까지 기다린 뒤 캐시에서 받음 (실패 결과는 저장되지 않으므로 다시 계산)
+            with locks.hold(repr(sorted(public.items()))):
+                try:
+                    return cached(public, secrets)
+                except _NotCached as e:
+                    return e.result
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,196 @@
+import contextvars
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from naver_cache import cached_call
+from naver_client import NAVER_API_BASE, get_client
+from shop_listings import normalize_listings
+from stage_timing import span
+
+# ----------------------------------------------------------------------
+# 네이버 쇼핑 검색 전체 페이지 수집
+# start 오프셋(최대 1000)을 동시에 요청하고, 도착하는 대로 productId 로 중복을 제거하면서
+# (판매처만 다른 같은 상품은 shop_listings 의 제목 signature 로 distinct_products 에 한 번만 셈)
+# 가격은 스트리밍 분위수 스케치에, 판매처는 카운터에 누적합니다. (상품 목록 전체를 들고 있지 않음)
+# 페이지 하나가 실패해도(HTTP 오류, 연결 오류, 할당량 부족, 카세트에 없음) 나머지는 계속 모으고 failed_pages 로 셉니다.
+# ----------------------------------------------------------------------
+
+SHOP_URL = f"{NAVER_API_BASE}/v1/search/shop.json"
+PAGE_SIZE = 100   # display 최댓값
+MAX_START = 1000  # start 최댓값
+DEFAULT_WORKERS = 5
+
+
+class QuantileSketch:
+    """
+    KLL 방식의 간단한 스트리밍 분위수 스케치.
+    레벨마다 최대 k 개만 보관하고, 가득 차면 정렬 후 절반만 (가중치 2배로) 윗 레벨로 올립니다.
+    메모리는 O(k log(n/k)), 순위 오차는 대략 1/k 수준입니다.
+    """
+
+    def __init__(self, k: int = 128, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.total = 0.0
+        self._levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._levels[0].append(value)
+        if len(self._levels[0]) >= self.k:
+            self._compact()
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self._levels) and len(self._levels[level]) >= self.k:
+            items = sorted(self._levels[level])
+            self._levels[level] = []
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            self._levels[level + 1].extend(items[self._rng.randint(0, 1)::2])
+            level += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self._levels) for value in items)
+        if not weighted:
+            return [None for _ in qs]
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+                continue
+            if q >= 1:
+                results.append(self.max)
+                continue
+            target, acc = q * total, 0
+            for value, weight in weighted:
+                acc += weight
+                if acc >= target:
+                    results.append(value)
+                    break
+        return results
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def size(self) -> int:
+        return sum(len(items) for items in self._levels)
+
+
+class ShopCrawlSummary:
+    """전체 수집 결과 요약. 중복 판별용 productId 집합(최대 1000개) 외에는 누적값만 보관합니다."""
+
+    def __init__(self, sketch_k: int = 128):
+        self.reported_total = 0
+        self.pages = 0
+        self.failed_pages = 0
+        self.items_seen = 0
+        self.duplicates = 0
+        self.prices = QuantileSketch(sketch_k)
+        self.malls = Counter()
+        self.own_items = 0
+        self._seen_ids = set()
+        self._signatures = set()  # 판매처만 다른 같은 상품을 하나로 세기 위한 제목 해시
+
+    @property
+    def unique_items(self) -> int:
+        return len(self._seen_ids)
+
+    @property
+    def distinct_products(self) -> int:
+        return len(self._signatures)
+
+    def add_page(self, data: Dict) -> None:
+        self.pages += 1
+        self.reported_total = max(self.reported_total, int(data.get("total", 0)))
+        for item in normalize_listings(data.get("items", [])):
+            self.items_seen += 1
+            product_id = item.get("productId") or item.get("link")
+            if product_id in self._seen_ids:
+                self.duplicates += 1
+                continue
+            self._seen_ids.add(product_id)
+            self._signatures.add(item["signature"])
+            self.own_items += item["own"]
+            try:
+                price = float(item.get("lprice") or 0)
+            except ValueError:
+                price = 0
+            if price > 0:
+                self.prices.add(price)
+            if item.get("mallName"):
+                self.malls[item["mallName"]] += 1
+
+    def to_dict(self) -> Dict:
+        p10, p25, p50, p75, p90 = self.prices.quantiles([0.1, 0.25, 0.5, 0.75, 0.9])
+        return {
+            "reported_total": self.reported_total, "pages": self.pages, "failed_pages": self.failed_pages,
+            "items_seen": self.items_seen,
+            "unique_items": self.unique_items, "duplicates": self.duplicates,
+            "distinct_products": self.distinct_products, "own_items": self.own_items, "priced_items": self.prices.count,
+            "p10": p10, "p25": p25, "median": p50, "p75": p75, "p90": p90, "mean": self.prices.mean,
+            "top_malls": self.malls.most_common(10),
+        }
+
+
+def _fetch_page(query: str, headers: Dict[str, str], start: int, page_size: int) -> Optional[Dict]:
+    """페이지 하나. 실패하면 예외 대신 None (QuotaExhausted, CassetteMiss 도 requests 예외)."""
+    params = {"query": query, "display": page_size, "start": start, "sort": "sim"}
+
+    def fetch():
+        response = get_client().get(SHOP_URL, headers=headers, params=params)
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, response.json()
+
+    with span("fetch:shop_page"):
+        try:
+            status, data, _ = cached_call(SHOP_URL, params, fetch)
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+    return data if status == 200 else None
+
+
+def crawl_shop(query: str, headers: Dict[str, str], max_items: int = MAX_START, page_size: int = PAGE_SIZE,
+               workers: int = DEFAULT_WORKERS, summary: Optional[ShopCrawlSummary] = None) -> ShopCrawlSummary:
+    """
+    첫 페이지로 전체 건수를 확인한 뒤, 필요한 나머지 페이지만 동시에 요청합니다.
+    페이지 응답은 도착 순서대로 summary 에 누적되고 바로 버려집니다.
+    """
+    summary = summary or ShopCrawlSummary()
+    first = _fetch_page(query, headers, 1, page_size)
+    if first is None:
+        summary.failed_pages += 1
+        return summary
+    summary.add_page(first)
+
+    limit = min(max_items, int(first.get("total", 0)), MAX_START + page_size - 1)
+    starts = list(range(1 + page_size, min(limit, MAX_START) + 1, page_size))
+    if not starts:
+        return summary
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _fetch_page, query, headers, start, page_size)
+                   for start in starts]
+        for future in as_completed(futures):
+            data = future.result()
+            if data is None:
+                summary.failed_pages += 1
+            else:
+                summary.add_page(data)
+    return summary
@@ -0,0 +1,213 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# ----------------------------------------------------------------------
+# 분석 파이프라인 단계별 소요시간 계측
+# span("fetch:shop") 처럼 외부 호출/분석 단계를 감싸면 현재 실행(run)에 기록되고,
+# 실행이 끝나면 JSON Lines 파일에 한 줄씩 추가됩니다. 여러 실행에 걸친 단계별 p50/p95 를 계산합니다.
+#   python stage_timing.py .cache/stage_timings.jsonl
+# 실행 밖에서 열린 span 은 기록하지 않으므로 계측 코드는 배치/테스트에서도 그대로 둘 수 있습니다.
+# ----------------------------------------------------------------------
+
+DEFAULT_TIMINGS_PATH = os.environ.get("GOREMI_TIMINGS_PATH", os.path.join(".cache", "stage_timings.jsonl"))
+HISTORY_SIZE = 5000  # 메모리에 보관하는 최근 span 수 (p50/p95 계산용)
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar("stage_timing_run", default=None)
+
+
+class Run:
+    """분석 한 번(제품 한 건)의 span 모음."""
+
+    def __init__(self, app: str, label: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.app = app
+        self.label = label
+        self.started_at = time.time()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, ok: bool = True) -> None:
+        entry = {"run": self.id, "app": self.app, "label": self.label, "stage": stage,
+                 "ms": round(seconds * 1000, 3), "ok": ok, "ts": round(time.time(), 3)}
+        with self._lock:
+            self.spans.append(entry)
+
+    def totals(self) -> Dict[str, float]:
+        """단계 이름별 합계(ms). 같은 단계가 여러 번 불렸으면 더합니다."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for entry in self.spans:
+                totals[entry["stage"]] = totals.get(entry["stage"], 0.0) + entry["ms"]
+        return totals
+
+
+class StageTimer:
+    def __init__(self, path: Optional[str] = DEFAULT_TIMINGS_PATH, history_size: int = HISTORY_SIZE):
+        self.path = path
+        self.history: deque = deque(maxlen=history_size)
+        self.last_run: Optional[Run] = None
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.history.extend(load_records(path))
+
+    @contextmanager
+    def run(self, app: str, label: str = "") -> Iterator[Run]:
+        """이 블록 안(과 copy_context 로 넘긴 작업 스레드)의 span 을 한 실행으로 묶습니다."""
+        run = Run(app, label)
+        token = _current_run.set(run)
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield run
+            ok = True
+        finally:
+            run.add("total", time.perf_counter() - started, ok)
+            _current_run.reset(token)
+            self._finish(run)
+
+    def _finish(self, run: Run) -> None:
+        with self._lock:
+            self.last_run = run
+            self.history.extend(run.spans)
+            if self.path:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in run.spans)
+
+    def stats(self, app: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            records = [r for r in self.history if app is None or r["app"] == app]
+        return summarize(records)
+
+    def export(self) -> str:
+        """메모리에 있는 최근 span 전체를 JSON Lines 문자열로."""
+        with self._lock:
+            return "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in self.history)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """현재 실행에 stage 소요시간을 기록합니다. 예외가 나면 ok=False 로 남기고 그대로 다시 던집니다."""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        run.add(stage, time.perf_counter() - started, ok)
+
+
+def record(stage: str, seconds: float, ok: bool = True) -> None:
+    """이미 잰 소요시간을 현재 실행에 기록합니다. (FetchResult.elapsed 처럼 호출하는 쪽에서 잰 경우)"""
+    run = _current_run.get()
+    if run is not None:
+        run.add(stage, seconds, ok)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # 선형 보간 (numpy.percentile 기본값과 같음)
+    position = (len(sorted_values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def summarize(records: Iterable[Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    단계별 count / p50 / p95 / max(ms) / 실패 건수.
+    한 실행 안에서 같은 단계가 여러 번 나오면 실행 단위로 합산한 값을 분포에 넣습니다.
+    """
+    per_run: Dict[tuple, float] = {}
+    failures: Dict[str, int] = {}
+    for entry in records:
+        key = (entry["stage"], entry["run"])
+        per_run[key] = per_run.get(key, 0.0) + entry["ms"]
+        if not entry.get("ok", True):
+            failures[entry["stage"]] = failures.get(entry["stage"], 0) + 1
+    samples: Dict[str, List[float]] = {}
+    for (stage, _), ms in per_run.items():
+        samples.setdefault(stage, []).append(ms)
+    stats = {}
+    for stage, values in samples.items():
+        values.sort()
+        stats[stage] = {"count": len(values), "p50": round(percentile(values, 0.5), 3),
+                        "p95": round(percentile(values, 0.95), 3), "max": values[-1],
+                        "failures": failures.get(stage, 0)}
+    return dict(sorted(stats.items(), key=lambda item: -item[1]["p50"]))
+
+
+def load_records(path: str) -> List[Dict]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:  # 기록 중 끊긴 마지막 줄
+                continue
+    return records
+
+
+def render_panel(st, app: str, run: Optional[Run] = None, timer: Optional[StageTimer] = None) -> None:
+    """
+    Streamlit 사이드바용 패널. st 모듈을 인자로 받아 이 모듈은 Streamlit 없이도 import 됩니다.
+    이번 실행(run, 없으면 프로세스의 마지막 실행)의 단계별 시간과 누적 p50/p95 를 보여주고 JSON Lines 로 내려받을 수 있습니다.
+    """
+    timer = timer or get_timer()
+    run = run or (timer.last_run if timer.last_run is not None and timer.last_run.app == app else None)
+    if run is not None:
+        totals = run.totals()
+        st.caption(f"마지막 실행: {run.label} · 전체 {totals.get('total', 0):,.0f} ms")
+        st.dataframe({"단계": list(totals), "ms": [round(v, 1) for v in totals.values()]}, hide_index=True)
+    stats = timer.stats(app)
+    if stats:
+        st.caption(f"누적 {stats.get('total', {}).get('count', 0)}회 실행 기준")
+        st.dataframe({
+            "단계": list(stats),
+            "p50 ms": [s["p50"] for s in stats.values()],
+            "p95 ms": [s["p95"] for s in stats.values()],
+            "실패": [s["failures"] for s in stats.values()],
+        }, hide_index=True)
+        st.download_button("⏱ JSONL 내보내기", timer.export().encode("utf-8"),
+                           file_name="stage_timings.jsonl", mime="application/jsonl")
+    else:
+        st.caption("아직 기록된 실행이 없습니다.")
+
+
+_default_timer = None
+_default_timer_lock = threading.Lock()
+
+
+def get_timer() -> StageTimer:
+    """프로세스 공용 타이머 (Streamlit 의 모든 세션이 같은 기록을 공유)."""
+    global _default_timer
+    with _default_timer_lock:
+        if _default_timer is None:
+            _default_timer = StageTimer()
+        return _default_timer
+
+
+def main(argv: List[str]) -> int:
+    path = argv[1] if len(argv) > 1 else DEFAULT_TIMINGS_PATH
+    app = argv[2] if len(argv) > 2 else None
+    records = [r for r in load_records(path) if app is None or r["app"] == app]
+    print(f"{'stage':<44}{'runs':>6}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}{'fail':>6}")
+    for stage, s in summarize(records).items():
+        print(f"{stage:<44}{s['count']:>6}{s['p50']:>12.1f}{s['p95']:>12.1f}{s['max']:>12.1f}{s['failures']:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import statistics
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+# ----------------------------------------------------------------------
+# 데이터랩 월간 시계열 로컬 저장소
+# (엔드포인트, 키워드, 카테고리)별로 이미 받은 월 데이터를 보관하고, 새로 필요한 최근 몇 달만 요청합니다.
+#
+# 데이터랩 ratio 는 요청 구간마다 "구간 내 최댓값 = 100" 으로 정규화되므로,
+# 새로 받은 구간은 저장된 값과 겹치는 완결된 달들의 비율(중앙값)로 저장소 기준에 맞춘 뒤 합칩니다.
+# 조회 시에는 요청한 기간 안에서 다시 최댓값 100 으로 맞춰, 한 번에 요청한 것과 같은 값을 돌려줍니다.
+# 겹치는 달이 모두 0 이라 맞출 기준이 없으면 저장된 이력은 지우지 않고, 전체 구간을 다시 받아 맞춥니다.
+# ----------------------------------------------------------------------
+
+DEFAULT_SERIES_PATH = os.environ.get("GOREMI_SERIES_PATH", os.path.join(".cache", "datalab_series.sqlite3"))
+OVERLAP_MONTHS = 2  # 재정규화 기준으로 삼을 완결된 겹침 달 수
+
+# fetch(start_date, end_date) -> [{"period": "YYYY-MM-DD", "ratio": float}, ...] 또는 실패 시 None
+SeriesFetcher = Callable[[date, date], Optional[List[Dict]]]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_key(period: str) -> str:
+    return period[:7] + "-01"
+
+
+class TrendStore:
+    def __init__(self, path: str = DEFAULT_SERIES_PATH):
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS series ("
+            " endpoint TEXT NOT NULL, keyword TEXT NOT NULL, category TEXT NOT NULL,"
+            " period TEXT NOT NULL, ratio REAL NOT NULL,"
+            " PRIMARY KEY (endpoint, keyword, category, period))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refreshed ("
+            " endpoint TEXT NOT NULL, keyword TEXT NOT NULL, category TEXT NOT NULL, day TEXT NOT NULL,"
+            " PRIMARY KEY (endpoint, keyword, category))"
+        )
+
+    def load(self, endpoint: str, keyword: str, category: str) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT period, ratio FROM series WHERE endpoint = ? AND keyword = ? AND category = ? ORDER BY period",
+                (endpoint, keyword, category),
+            ).fetchall()
+        return dict(rows)
+
+    def refreshed_on(self, endpoint: str, keyword: str, category: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT day FROM refreshed WHERE endpoint = ? AND keyword = ? AND category = ?",
+                (endpoint, keyword, category),
+            ).fetchone()
+        return row[0] if row else None
+
+    def merge(self, endpoint: str, keyword: str, category: str, points: List[Dict], today: date,
+              force: bool = False) -> bool:
+        """
+        새로 받은 구간을 저장소 기준으로 재정규화해서 합칩니다.
+        기준: 저장된 마지막 달(부분 월일 수 있음)을 제외한 겹치는 달들의 (저장값 / 새값) 중앙값.
+        기준으로 삼을 (양쪽 모두 0 이 아닌) 달이 없으면 아무것도 쓰지 않고 False 를 돌려줍니다. (저장된 이력 유지)
+        force=True 면 그때도 배율 1 로 받은 달만 덮어씁니다. (나머지 이력은 유지)
+        """
+        new = {_month_key(p["period"]): float(p.get("ratio", 0)) for p in points}
+        stored = self.load(endpoint, keyword, category)
+        scale = 1.0
+        if stored:
+            latest = max(stored)
+            anchors = [stored[m] / new[m] for m in new if m in stored and m != latest and new[m] > 0 and stored[m] > 0]
+            if anchors:
+                scale = statistics.median(anchors)
+            elif not force:
+                return False
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO series (endpoint, keyword, category, period, ratio) VALUES (?, ?, ?, ?, ?)",
+                [(endpoint, keyword, category, period, ratio * scale) for period, ratio in new.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refreshed (endpoint, keyword, category, day) VALUES (?, ?, ?, ?)",
+                (endpoint, keyword, category, today.isoformat()),
+            )
+        return True
+
+    def clear(self, endpoint: str, keyword: str, category: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM series WHERE endpoint = ? AND keyword = ? AND category = ?",
+                               (endpoint, keyword, category))
+
+
+def monthly_series(fetch: SeriesFetcher, endpoint: str, keyword: str, category: str = "",
+                   days: int = 365, today: Optional[date] = None,
+                   store: Optional[TrendStore] = None) -> Optional[List[Dict]]:
+    """
+    최근 days 일 구간의 월간 시계열을 돌려줍니다. (최댓값 100 기준으로 재정규화)
+    - 처음: 전체 구간 1회 요청
+    - 이후: 저장된 마지막 달 OVERLAP_MONTHS 개월 전부터 오늘까지만 요청 (오늘 이미 갱신했으면 요청 없음)
+    요청이 실패하고 저장된 값도 없으면 None, 데이터가 없으면 [].
+    """
+    store = store or get_store()
+    today = today or date.today()
+    window_start = month_start(today - timedelta(days=days))
+    stored = store.load(endpoint, keyword, category)
+
+    if not stored or store.refreshed_on(endpoint, keyword, category) != today.isoformat():
+        if stored:
+            start = add_months(date.fromisoformat(max(stored)), -OVERLAP_MONTHS)
+        else:
+            start = window_start
+        points = fetch(start, today)
+        if points and not store.merge(endpoint, keyword, category, points, today):
+            # 겹치는 달에 0 이 아닌 기준값이 없어 이어 붙일 수 없음: 이력은 그대로 두고 전체 구간을 다시 받아
+            # 이어 붙이고, 그래도 기준 달이 없으면 받은 구간만 새 값으로 덮어씀
+            if start > window_start:
+                points = fetch(window_start, today)
+            if points and (start <= window_start or not store.merge(endpoint, keyword, category, points, today)):
+                store.merge(endpoint, keyword, category, points, today, force=True)
+        if points:
+            stored = store.load(endpoint, keyword, category)
+        elif not stored:
+            return None if points is None else []
+
+    window = [(period, ratio) for period, ratio in sorted(stored.items()) if period >= window_start.isoformat()]
+    if not window:
+        return []
+    peak = max(ratio for _, ratio in window)
+    return [{"period": period, "ratio": round(ratio * 100.0 / peak, 5) if peak > 0 else 0.0} for period, ratio in window]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_store() -> TrendStore:
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TrendStore()
+        return _default_store
@@ -1,34 +1,47 @@
-
 import streamlit as st
 
+from price_tiers import TIER_LABELS, compute_tier_dict, compute_tiers
+
 st.title("🧮 고래미 단가 자동 계산기")
 
 # 입력 방식 선택
 input_mode = st.radio("기준가 입력 방식 선택", ["판매가 기준", "도매가 기준"])
+basis = "selling" if input_mode == "판매가 기준" else "wholesale"
 
 if input_mode == "판매가 기준":
     price = st.number_input("판매가를 입력하세요 (₩)", min_value=0)
-    selling_price = price
-    wholesale_price = round(selling_price * 0.58)
 else:
     price = st.number_input("도매가를 입력하세요 (₩)", min_value=0)
-    selling_price = round(price / 0.58)
-    wholesale_price = price
-
-# 계산
-result = {
-    "📦 판매가": selling_price,
-    "🏢 사업자가(24%)": round(selling_price * 0.76),
-    "🧾 도매가(42%)": wholesale_price,
-    "📦 박스가(일반)": round(selling_price * 0.70),
-    "📦 박스가(사업자)": round(selling_price * 0.60),
-    "📦 박스가(도매)": round(selling_price * 0.52),
-    "🏬 픽업가(일반)": round(selling_price * 0.60),
-    "🏬 픽업가(사업자)": round(selling_price * 0.50),
-    "🏬 픽업가(도매)": round(selling_price * 0.42),
-}
+
+# 계산 (등급표는 price_tiers.TIER_TABLE)
+result = compute_tier_dict(price, basis)
 
 # 출력
 st.subheader("💰 계산 결과")
 for label, value in result.items():
     st.write(f"{label}: {value:,} 원")
+
+# 가격표 일괄 계산 (CSV 업로드 -> 전체 등급 계산 -> CSV 다운로드)
+st.markdown("---")
+st.subheader("📂 가격표 일괄 계산")
+uploaded = st.file_uploader(f"CSV 가격표 업로드 ({input_mode}, 가격 열 1개 이상)", type=["csv"])
+if uploaded is not None:
+    import pandas as pd
+
+    price_list = pd.read_csv(uploaded, encoding="utf-8-sig")
+    numeric_columns = [c for c in price_list.columns if pd.api.types.is_numeric_dtype(price_list[c])]
+    if not numeric_columns:
+        st.error("숫자로 된 가격 열을 찾을 수 없습니다.")
+    else:
+        price_column = st.selectbox("가격 열 선택", numeric_columns)
+        prices = price_list[price_column].fillna(0).to_numpy()
+        tiers = pd.DataFrame(compute_tiers(prices, basis), columns=TIER_LABELS, index=price_list.index)
+        priced = pd.concat([price_list, tiers], axis=1)
+        st.write(f"총 {len(priced):,}개 품목 계산 완료")
+        st.dataframe(priced.head(100))
+        st.download_button(
+            "💾 계산 결과 다운로드 (CSV)",
+            priced.to_csv(index=False).encode("utf-8-sig"),
+            file_name="고래미_단가표.csv",
+            mime="text/csv",
+        )
@@ -1,26 +1,6 @@
 import streamlit as st
 
-# 요소별 점수표 (20~70% 범위 고려)
-competition_margin = {"낮음": 0.10, "보통": 0.00, "높음": -0.10}
-demand_margin = {"높음": 0.10, "보통": 0.00, "낮음": -0.10}
-scale_margin = {"소량": 0.10, "중간": 0.00, "대량": -0.10}
-production_margin = {"적음": 0.10, "중간": 0.00, "높음": -0.05}
-ingredient_margin = {"예": -0.10, "아니오": 0.00}
-retail_margin = {"예": 0.10, "아니오": 0.00}
-
-BASE_MARGIN = 0.45  # 기준점 (45%)
-
-def calc_suggested_margin(competition, demand, scale, prod_scale, ingredient, retail):
-    adjustments = [
-        competition_margin[competition],
-        demand_margin[demand],
-        scale_margin[scale],
-        production_margin[prod_scale],
-        ingredient_margin[ingredient],
-        retail_margin[retail],
-    ]
-    margin = BASE_MARGIN + sum(adjustments)
-    return round(min(max(margin, 0.20), 0.70), 4)
+from margin_table import RETAIL_MARKUP, calc_prices, calc_suggested_margin, factor_sensitivity
 
 # UI 구성
 st.title("📊 고래미 신제품 가격 제안 도구")
@@ -52,10 +32,44 @@ input_margin = st.number_input("2. 적용할 마진율 (%)", min_value=0.0, max_
 
 if cogs > 0 and input_margin > 0:
     margin_ratio = input_margin / 100
-    wholesale = round(cogs / (1 - margin_ratio), -1)
-    retail_price = round(wholesale * 1.5, -1) if retail == "예" else round(wholesale * 1.2, -1)
+    wholesale, retail_price = calc_prices(cogs, margin_ratio, RETAIL_MARKUP[retail])
 
     st.metric("권장 도매 단가 (VAT 별도)", f"{wholesale:,.0f} ₩")
     st.metric("권장 소비자 가격 (VAT 별도)", f"{retail_price:,.0f} ₩")
 else:
     st.info("제조원가와 적용 마진율을 입력해주세요.")
+
+# 요인별 민감도 (324개 조합 x 제조원가 범위 전체를 한 번에 계산)
+st.markdown("---")
+st.subheader("🔍 요인별 가격 민감도")
+st.caption("각 요인의 수준을 바꿨을 때, 나머지 요인의 모든 조합과 제조원가 범위에 걸쳐 평균 소비자 가격이 얼마나 달라지는지 보여줍니다.")
+s1, s2, s3 = st.columns(3)
+with s1:
+    cogs_min = st.number_input("제조원가 최소 (₩)", min_value=10.0, value=1000.0, step=100.0)
+with s2:
+    cogs_max = st.number_input("제조원가 최대 (₩)", min_value=10.0, value=10000.0, step=100.0)
+with s3:
+    cogs_step = st.number_input("간격 (₩)", min_value=10.0, value=500.0, step=10.0)
+
+if cogs_max >= cogs_min:
+    import numpy as np
+
+    rows = factor_sensitivity(np.arange(cogs_min, cogs_max + cogs_step / 2, cogs_step))
+    st.dataframe(
+        {
+            "요인": [r[0] for r in rows],
+            "수준": [r[1] for r in rows],
+            "평균 도매 단가 (₩)": [round(r[2]) for r in rows],
+            "평균 소비자 가격 (₩)": [round(r[3]) for r in rows],
+            "전체 평균 대비 (₩)": [round(r[4]) for r in rows],
+        },
+        hide_index=True,
+    )
+    spread = {}
+    for factor, _, _, retail_avg, _ in rows:
+        low, high = spread.get(factor, (retail_avg, retail_avg))
+        spread[factor] = (min(low, retail_avg), max(high, retail_avg))
+    st.bar_chart({"요인": list(spread), "소비자 가격 변동폭 (₩)": [high - low for low, high in spread.values()]},
+                 x="요인", y="소비자 가격 변동폭 (₩)")
+else:
+    st.info("제조원가 최대값이 최소값보다 커야 합니다.")